@@ -0,0 +1,165 @@
+import statistics
+
+import pytest, pytest_asyncio
+from pytest_asyncio import is_async_test
+from playwright.async_api import async_playwright
+
+#### before the first uitap import: the modules below are also pytest_plugins and get their asserts rewritten
+pytest.register_assert_rewrite("uitap")
+
+from uitap import session, snapshot, static
+from uitap.manifest import LANDING, PAGES
+from uitap.replay import MODES as REPLAY_MODES
+
+pytest_plugins = ["uitap.sleep_audit", "uitap.navigation", "uitap.instrument", "uitap.bench", "uitap.concurrent",
+                  "uitap.shard", "uitap.timeouts", "uitap.recorder",
+                  "uitap.incremental", "uitap.perf", "uitap.load",
+                  "uitap.fuzz", "uitap.uploads"]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap", "UI Test Automation Playground")
+    group.addoption("--context-pool-size", type=int, default=2,
+                    help="number of pre-warmed browser contexts kept ready (default: 2)")
+    group.addoption("--context-max-uses", type=int, default=1,
+                    help="hand a context to this many tests before replacing it (default: 1, a fresh context per test)")
+    group.addoption("--fresh-browser", action="store_true",
+                    help="launch a new browser for every test instead of sharing one per session")
+    group.addoption("--no-daemon", action="store_true",
+                    help="launch the browser in-process even when the warm browser daemon (python -m uitap.daemon) runs")
+    group.addoption("--replay-mode", choices=REPLAY_MODES, default="off",
+                    help="record: save every response into the archive, replay: answer only from the archive (no network)")
+    group.addoption("--replay-archive", default="archive",
+                    help="directory of the record/replay archive (default: archive)")
+    group.addoption("--fake-time", action="store_true",
+                    help="install a fake page clock and fast-forward through page-side setTimeout/setInterval delays")
+    group.addoption("--static", action="store_true",
+                    help="also run the browserless checks on the served HTML (test_static.py)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "static: checks on the served HTML only, no browser, runs only with --static")
+
+
+def pytest_collection_modifyitems(config, items):
+    #### Browser, pool and tests must share one event loop for the whole session.
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    #### the static lane repeats contracts the browser tests check, so it is opt-in (and needs the target or an archive)
+    skip_static = None if config.getoption("static") else pytest.mark.skip(reason="static check, run with --static")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+        if skip_static is not None and item.get_closest_marker("static"):
+            item.add_marker(skip_static)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def playwright():
+    async with async_playwright() as playwright:
+        yield playwright
+
+
+@pytest.fixture(scope="session")
+def browser_launch_args(pytestconfig):
+    return session.launch_args(pytestconfig)
+
+
+@pytest.fixture(scope="session")
+def base_url(pytestconfig):
+    return session.base_url(pytestconfig)
+
+
+@pytest.fixture(scope="session")
+def replay_archive(pytestconfig, base_url):
+    archive = session.open_archive(pytestconfig)
+    yield archive
+    if archive is not None:
+        archive.save()
+
+
+@pytest.fixture(scope="session")
+def static_site(pytestconfig, base_url):
+    site = static.StaticSite(base_url, session.open_archive(pytestconfig))
+    site.prefetch([LANDING.href] + [p.href for p in PAGES])
+    yield site
+    site.close()
+
+
+@pytest.fixture(scope="session")
+def context_options(pytestconfig, base_url):
+    return session.context_options(pytestconfig)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def browser(playwright, pytestconfig):
+    browser = await session.open_browser(playwright, pytestconfig)
+    yield browser
+    await browser.close()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def context_pool(browser, pytestconfig, replay_archive):
+    if pytestconfig.getoption("fresh_browser"):
+        yield None
+        return
+    pool = await session.start_pool(browser, pytestconfig, replay_archive)
+    yield pool
+    await pool.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def page(request, pytestconfig, context_pool, playwright, browser_launch_args, context_options, replay_archive):
+    if context_pool is None:
+        #### Previous behaviour, kept to compare setup/teardown cost against the pool.
+        browser = await playwright.chromium.launch(**browser_launch_args)
+        context = await browser.new_context(**context_options)
+        await session.prepare_context(context, pytestconfig, replay_archive)
+        page = await context.new_page()
+        try:
+            async with session.prepared(page, request.node):
+                yield page
+        finally:
+            #### prepared may raise at exit (e.g. --perf=enforce), the browser must go anyway
+            await page.close()
+            await context.close()
+            await browser.close()
+        return
+    async with context_pool.page() as page, session.prepared(page, request.node):
+        yield page
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def shared_page(request, pytestconfig, browser, context_options, replay_archive):
+    """One page per test module whose state is kept between tests, see uitap.snapshot."""
+    context = await browser.new_context(**context_options)
+    await session.prepare_context(context, pytestconfig, replay_archive)
+    page = await context.new_page()
+    try:
+        async with session.prepared(page, request.node):
+            yield snapshot.SharedPage(page)
+    finally:
+        await context.close()
+
+
+_fixture_times = {}
+
+
+def pytest_runtest_logreport(report):
+    if report.when in ("setup", "teardown") and report.outcome != "skipped":
+        _fixture_times[report.nodeid] = _fixture_times.get(report.nodeid, 0.0) + report.duration
+
+
+def pytest_terminal_summary(terminalreporter):
+    archive = getattr(terminalreporter.config, "_uitap_replay_archive", None)
+    if archive is not None and archive.misses:
+        terminalreporter.write_sep("-", "replay archive misses")
+        for key in sorted(set(archive.misses)):
+            terminalreporter.write_line(key)
+    if not _fixture_times:
+        return
+    per_test = sorted(_fixture_times.values())
+    mode = "fresh browser per test" if terminalreporter.config.getoption("fresh_browser") else "shared browser + context pool"
+    terminalreporter.write_sep("-", "fixture setup/teardown time")
+    terminalreporter.write_line(
+        f"{mode}: {len(per_test)} tests, median {statistics.median(per_test) * 1000:.0f} ms, "
+        f"mean {statistics.mean(per_test) * 1000:.0f} ms, total {sum(per_test):.2f} s per run")
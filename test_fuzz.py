@@ -0,0 +1,75 @@
+from playwright.async_api import expect
+from playwright.sync_api._generated import Page
+import pytest
+from uitap.fuzz import Throughput, inputs, shrink
+from uitap.navigation import open_page
+
+#### generated inputs, one page per test, reset in place between cases; run with --fuzz N (uitap/fuzz.py)
+pytestmark = pytest.mark.fuzz
+
+MAX_REPORTED = 3
+
+
+async def check_all(request, cases, check):
+    """Run ``check(case)`` (returns None or a mismatch) for every case, shrink the first failures."""
+    throughput = Throughput(request.node.nodeid)
+    failures, count = [], 0
+    for count, case in enumerate(cases, 1):
+        if await check(case) is not None and len(failures) < MAX_REPORTED:
+            failures.append(case)
+    throughput.done(count)
+    reproducers = []
+    for case in failures:
+        async def fails(candidate):
+            return await check(candidate) is not None
+        minimal = await shrink(case, fails)
+        reproducers.append(f"{minimal!r}: {await check(minimal)}")
+    assert not reproducers, f"seed {request.config.getoption('fuzz_seed')}, minimal failing inputs:\n" + "\n".join(reproducers)
+
+
+@pytest.mark.asyncio
+async def test_fuzz_sample_app(page: Page, request):
+    await open_page(page, "/sampleapp")
+    await expect(page).to_have_title("Sample App")
+    user_name = page.locator('input[name="UserName"]')
+    password = page.locator('input[name="Password"]')
+    login = page.locator('button[id="login"]')
+    status = page.locator('label[id="loginstatus"]')
+
+    async def check(case):
+        name, pwd = case
+        #### in-page reset: log out when the previous case logged in
+        if await login.text_content() == "Log Out":
+            await login.click()
+        await user_name.fill(name)
+        await password.fill(pwd)
+        await login.click()
+        expected = f"Welcome, {name}!" if name and pwd == "pwd" else "Invalid username/password"
+        actual = await status.text_content()
+        return None if actual == expected else f"expected {expected!r}, got {actual!r}"
+
+    n, seed = request.config.getoption("fuzz"), request.config.getoption("fuzz_seed")
+    #### every other case uses the valid password so both outcomes get covered
+    cases = ((name, "pwd" if i % 2 else pwd)
+             for i, (name, pwd) in enumerate(zip(inputs("username", n, seed), inputs("password", n, seed + 1))))
+    await check_all(request, cases, check)
+
+
+@pytest.mark.asyncio
+async def test_fuzz_text_input(page: Page, request):
+    await open_page(page, "/textinput")
+    await expect(page).to_have_title("Text Input")
+    text_input_field = page.locator('input[id="newButtonName"]')
+    updating_button = page.locator('button[id="updatingButton"]')
+
+    async def check(case):
+        name, = case
+        if not name:
+            return None
+        await text_input_field.fill(name)
+        await updating_button.click()
+        actual = await updating_button.text_content()
+        return None if actual == name else f"button text {actual!r}"
+
+    n, seed = request.config.getoption("fuzz"), request.config.getoption("fuzz_seed")
+    await check_all(request, ((text,) for text in inputs("text", n, seed)), check)
@@ -0,0 +1,29 @@
+import pytest
+from uitap.manifest import LANDING, PAGES
+from uitap.static import title
+
+#### served HTML only: no browser, all routes fetched at once over one connection pool (uitap/static.py)
+pytestmark = pytest.mark.static
+
+
+@pytest.mark.parametrize("playground_page", (LANDING,) + PAGES, ids=lambda p: p.href)
+def test_static_title(static_site, playground_page):
+    assert title(static_site.document(playground_page.href)) == playground_page.title
+
+
+def test_static_navbar(static_site):
+    navbar = static_site.document("/").find("nav", class_="navbar navbar-expand-lg navbar-light bg-light")
+    assert navbar is not None
+    assert navbar.find("a", class_="navbar-brand").text.strip() == "UITAP"
+
+
+def test_static_overview(static_site):
+    overview = static_site.document("/").find("section", id="overview")
+    headings = overview.find_all("h3")
+    assert [" ".join(h.text.split()) for h in headings] == [p.heading for p in PAGES]
+    assert [h.find("a").attrs.get("href") for h in headings] == [p.href for p in PAGES]
+
+
+def test_static_text_input_placeholder(static_site):
+    text_input_field = static_site.document("/textinput").find("input", id="newButtonName")
+    assert text_input_field.attrs.get("placeholder") == "MyButton"
@@ -0,0 +1,55 @@
+import time
+
+from playwright.async_api import expect
+from playwright.sync_api._generated import Page
+import pytest
+from uitap.navigation import open_page
+from uitap.uploads import PeakMemory, generate, generate_batch, parse_size, record, scratch_directory
+from uitap.waits import file_selection_processed
+
+#### generated files on disk, timed until the upload frame reports the selection; run with --uploads (uitap/uploads.py)
+#### fixed_timeouts: the upload actions share their latency keys with the small upload in test_ui_playground.py
+pytestmark = [pytest.mark.uploads, pytest.mark.fixed_timeouts]
+
+SIZES = ["1KiB", "1MiB", "64MiB", "256MiB", "512MiB"]
+#### (files, size of each)
+BATCHES = [(10, "100KiB"), (200, "4KiB"), (1000, "1KiB")]
+#### RSS growth allowed while the selection is processed, whatever the total size
+PYTHON_BOUND_KIB = 64 * 1024
+BROWSER_BOUND_KIB = 256 * 1024
+SELECTION_TIMEOUT = 120000
+
+
+async def select_and_measure(page: Page, request, files):
+    if not getattr(request.config, "_uitap_browser_in_process", False):
+        pytest.fail("the browser is not a child of this run (warm daemon), its memory cannot be measured")
+    await open_page(page, "/upload")
+    await expect(page).to_have_title("File Upload")
+    frame = page.frame_locator("iframe")
+    browse_file_input = frame.locator('input[id="browse"]')
+    async with PeakMemory() as peak:
+        started = time.perf_counter()
+        await browse_file_input.set_input_files(files, timeout=SELECTION_TIMEOUT)
+        await file_selection_processed(frame, len(files), timeout=SELECTION_TIMEOUT)
+        seconds = time.perf_counter() - started
+    record(request.node.nodeid, len(files), sum(f.stat().st_size for f in files), seconds,
+           peak.python_kib, peak.browser_kib)
+    assert peak.python_kib <= PYTHON_BOUND_KIB, f"python RSS grew by up to {peak.python_kib / 1024:.0f} MiB"
+    assert peak.browser_kib <= BROWSER_BOUND_KIB, f"browser RSS grew by up to {peak.browser_kib / 1024:.0f} MiB"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", SIZES)
+async def test_upload_single_file(page: Page, request, size):
+    with scratch_directory() as directory:
+        path = generate(directory / f"upload-{size}.bin", parse_size(size))
+        await select_and_measure(page, request, [path])
+        await expect(page.frame_locator("iframe").locator('div[class="file-info"]')).to_have_text(path.name)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count, size", BATCHES)
+async def test_upload_many_files(page: Page, request, count, size):
+    with scratch_directory() as directory:
+        files = generate_batch(directory, count, parse_size(size))
+        await select_and_measure(page, request, files)
@@ -0,0 +1 @@
+"""Support code for the UI Test Automation Playground suite (fixtures, helpers and pytest plugins)."""
@@ -0,0 +1,194 @@
+"""Benchmark harness: run the suite N times, keep a baseline, flag p95 regressions.
+
+    python -m uitap.bench -n 5                       # compare against benchmarks/baseline.json
+    python -m uitap.bench -n 5 --update-baseline     # store this run as the new baseline
+    python -m uitap.bench -n 3 -- -k auto_wait --base-url http://localhost:8080
+
+Everything after ``--`` goes to pytest; the default target is
+``test_ui_playground.py --replay-mode=replay``, i.e. the local archive. Every
+run writes per-test durations (setup + call + teardown), browser launch time
+and wall time through the ``--bench-output`` pytest option of this module.
+The command exits with status 1 when a test's p95 is more than ``--threshold``
+slower than the baseline (and by at least ``--min-delta-ms``) or a baseline
+test did not pass, and stops as soon as a pytest run exits with a non-zero status.
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE = Path("benchmarks") / "baseline.json"
+DEFAULT_PYTEST_ARGS = ["test_ui_playground.py", "--replay-mode=replay"]
+
+_durations = {}
+_outcomes = {}
+_session_started = None
+
+
+#### pytest plugin side
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--bench-output", default=None, metavar="PATH",
+                    help="write per-test durations, browser launch and wall time of this run to PATH (JSON)")
+
+
+def pytest_sessionstart(session):
+    global _session_started
+    _session_started = time.perf_counter()
+
+
+def pytest_runtest_logreport(report):
+    _durations[report.nodeid] = _durations.get(report.nodeid, 0.0) + report.duration
+    if report.when == "call" or report.outcome != "passed":
+        _outcomes[report.nodeid] = report.outcome
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption("bench_output")
+    if not path:
+        return
+    result = {
+        "wall_s": time.perf_counter() - _session_started,
+        "launch_s": getattr(session.config, "_uitap_browser_launch_s", None),
+        "tests": {nodeid: d for nodeid, d in _durations.items() if _outcomes.get(nodeid) == "passed"},
+        "outcomes": _outcomes,
+    }
+    Path(path).write_text(json.dumps(result, indent=1), encoding="utf-8")
+
+
+#### command line side
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def distribution(values):
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95), "max": max(values), "n": len(values)}
+
+
+def run_suite(runs, pytest_args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(runs):
+            output = Path(tmp) / f"run{i}.json"
+            command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                       f"--bench-output={output}", *pytest_args]
+            started = time.perf_counter()
+            returncode = subprocess.run(command, stdout=subprocess.DEVNULL).returncode
+            elapsed = time.perf_counter() - started
+            if not output.exists():
+                raise SystemExit(f"run {i + 1}: pytest did not produce {output}")
+            result = json.loads(output.read_text(encoding="utf-8"))
+            if returncode != 0:
+                failed = sorted(nodeid for nodeid, outcome in result["outcomes"].items() if outcome != "passed")
+                raise SystemExit(f"run {i + 1}: pytest exited with status {returncode}, timings are not comparable"
+                                 + "".join(f"\n  {nodeid}" for nodeid in failed))
+            result["process_s"] = elapsed
+            results.append(result)
+            print(f"run {i + 1}/{runs}: {elapsed:.1f} s, {len(result['tests'])} tests passed")
+    return results
+
+
+def summarize(results, pytest_args):
+    per_test = {}
+    for result in results:
+        for nodeid, seconds in result["tests"].items():
+            per_test.setdefault(nodeid, []).append(seconds)
+    launches = [r["launch_s"] for r in results if r["launch_s"] is not None]
+    return {
+        "version": BASELINE_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pytest_args": pytest_args,
+        "runs": len(results),
+        "launch_s": distribution(launches) if launches else None,
+        "wall_s": distribution([r["wall_s"] for r in results]),
+        "process_s": distribution([r["process_s"] for r in results]),
+        "tests": {nodeid: distribution(values) for nodeid, values in sorted(per_test.items())},
+    }
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    regressions = []
+    for nodeid, now in current["tests"].items():
+        before = baseline["tests"].get(nodeid)
+        if before is None:
+            continue
+        delta = now["p95"] - before["p95"]
+        if now["p95"] > before["p95"] * (1 + threshold) and delta * 1000 >= min_delta_ms:
+            regressions.append((nodeid, before["p95"], now["p95"]))
+    return regressions
+
+
+def missing(baseline, current):
+    """Baseline tests that did not pass (or did not run) in the current runs."""
+    return sorted(set(baseline["tests"]) - set(current["tests"]))
+
+
+def print_summary(summary):
+    launch = summary["launch_s"]
+    print(f"\nwall p50 {summary['wall_s']['p50']:.2f} s  p95 {summary['wall_s']['p95']:.2f} s  "
+          f"max {summary['wall_s']['max']:.2f} s" +
+          (f" | browser launch p50 {launch['p50'] * 1000:.0f} ms" if launch else ""))
+    print(f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}  test")
+    for nodeid, d in sorted(summary["tests"].items(), key=lambda item: item[1]["p95"], reverse=True):
+        print(f"{d['p50'] * 1000:8.0f} {d['p95'] * 1000:8.0f} {d['max'] * 1000:8.0f}  {nodeid}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    pytest_args = DEFAULT_PYTEST_ARGS
+    if "--" in argv:
+        split = argv.index("--")
+        argv, pytest_args = argv[:split], argv[split + 1:] or DEFAULT_PYTEST_ARGS
+    parser = argparse.ArgumentParser(prog="python -m uitap.bench", description=__doc__.split("\n")[0])
+    parser.add_argument("-n", "--runs", type=int, default=5, help="number of suite runs (default: 5)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help=f"baseline file (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 slowdown as a fraction (default: 0.2)")
+    parser.add_argument("--min-delta-ms", type=float, default=100, help="ignore p95 slowdowns smaller than this (default: 100)")
+    args = parser.parse_args(argv)
+
+    summary = summarize(run_suite(args.runs, pytest_args), pytest_args)
+    print_summary(summary)
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(summary, indent=1) + "\n", encoding="utf-8")
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nno baseline at {args.baseline}, run with --update-baseline to create one")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("version") != BASELINE_VERSION:
+        print(f"\nbaseline {args.baseline} has version {baseline.get('version')}, expected {BASELINE_VERSION}; refresh it")
+        return 1
+    regressions = compare(baseline, summary, args.threshold, args.min_delta_ms)
+    gone = missing(baseline, summary)
+    if not regressions and not gone:
+        print(f"\nno p95 regression against {args.baseline}")
+        return 0
+    if regressions:
+        print(f"\np95 regressions against {args.baseline} (threshold {args.threshold:.0%}):")
+        for nodeid, before, now in regressions:
+            print(f"  {nodeid}: {before * 1000:.0f} ms -> {now * 1000:.0f} ms")
+    if gone:
+        print(f"\nin {args.baseline} but not passed in this run:")
+        for nodeid in gone:
+            print(f"  {nodeid}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
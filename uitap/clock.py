@@ -0,0 +1,30 @@
+"""Opt-in fake time for page-side timers (``--fake-time``).
+
+With fake time the context clock is installed before the first navigation, so
+``setTimeout``/``setInterval``/``Date`` in the page are under test control.
+Tests mark the spots where the page sits on a timer with ``advance``: under
+fake time the clock jumps forward and due timers fire at once, in order;
+under real time it is a no-op and the following ``expect`` waits as before.
+Server-side delays (the ``/ajaxdata`` response) are not affected.
+"""
+import weakref
+
+from playwright.async_api import BrowserContext, Page
+
+_fake_contexts = weakref.WeakSet()
+
+
+async def install(context: BrowserContext):
+    if context not in _fake_contexts:
+        await context.clock.install()
+        _fake_contexts.add(context)
+
+
+def is_fake(page: Page) -> bool:
+    return page.context in _fake_contexts
+
+
+async def advance(page: Page, ms: int):
+    """Fire every page timer due within ``ms`` milliseconds (fake time only)."""
+    if is_fake(page):
+        await page.clock.run_for(ms)
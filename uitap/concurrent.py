@@ -0,0 +1,187 @@
+"""pytest plugin: run independent async tests concurrently on one event loop (``--concurrency N``).
+
+Eligible tests (async, only the ``page`` fixture plus parametrize arguments, no
+skip/xfail marks, not marked ``@pytest.mark.serial``) run as tasks on a private
+event loop, at most N at a time, each on its own context from a pool sharing
+one browser. Every other test then runs through the normal pytest protocol.
+
+Reports are built by the regular ``pytest_runtest_makereport`` hook, so
+terminal output, pytest-html and the other uitap plugins see one report per
+phase as usual. ``print`` output is captured per task and attached to the
+test's own report.
+"""
+import asyncio
+import contextvars
+import inspect
+import io
+import sys
+import time
+
+import pytest
+from _pytest.runner import CallInfo
+from playwright.async_api import async_playwright
+
+from uitap.session import open_archive, open_browser, prepared as prepared_page, start_pool
+from uitap.instrument import current_test
+
+_SUPPORTED_FIXTURES = {"page"}
+_UNSUPPORTED_MARKS = ("skip", "skipif", "xfail", "usefixtures", "serial")
+
+_output = contextvars.ContextVar("uitap_test_output", default=None)
+
+#### pytest.skip/fail/xfail raise BaseException subclasses; makereport turns them into the right outcome
+OUTCOME_EXCEPTIONS = (Exception, pytest.skip.Exception, pytest.fail.Exception, pytest.xfail.Exception)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--concurrency", type=int, default=1, metavar="N",
+                    help="run up to N independent tests at the same time in this process (default: 1, off)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "serial: never run this test concurrently with others (clipboard, dialogs)")
+
+
+def is_concurrent(item, fixtures=_SUPPORTED_FIXTURES) -> bool:
+    function = getattr(item, "obj", None)
+    if not inspect.iscoroutinefunction(function):
+        return False
+    if any(item.get_closest_marker(name) for name in _UNSUPPORTED_MARKS):
+        return False
+    params = getattr(getattr(item, "callspec", None), "params", {})
+    return set(inspect.signature(function).parameters) <= set(fixtures) | set(params)
+
+
+class _TaskOutput(io.TextIOBase):
+    """sys.stdout stand-in that sends writes to the running test's own buffer."""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        return (_output.get() or self._fallback).write(text)
+
+    def flush(self):
+        self._fallback.flush()
+
+
+def _phase(item, when, started, error=None):
+    excinfo = pytest.ExceptionInfo.from_exception(error) if error is not None else None
+    call = CallInfo(None, excinfo, start=started[0], stop=time.time(),
+                    duration=time.perf_counter() - started[1], when=when, _ispytest=True)
+    return item.ihook.pytest_runtest_makereport(item=item, call=call)
+
+
+def _now():
+    return time.time(), time.perf_counter()
+
+
+async def _run_one(item, pool, limit):
+    async with limit:
+        current_test.set(item.nodeid)
+        output = io.StringIO()
+        _output.set(output)
+        started = _now()
+        slot = prepared = None
+        try:
+            slot = await pool.acquire()
+            prepared = prepared_page(slot.page, item)
+            page = await prepared.__aenter__()
+        except OUTCOME_EXCEPTIONS as e:
+            if slot is not None:
+                await pool.release(slot)
+            return [_phase(item, "setup", started, e)]
+        reports = [_phase(item, "setup", started)]
+
+        item.funcargs = dict(getattr(getattr(item, "callspec", None), "params", {}), page=page)
+        arguments = {name: item.funcargs[name] for name in inspect.signature(item.obj).parameters}
+        started, error = _now(), None
+        try:
+            await item.obj(**arguments)
+        except OUTCOME_EXCEPTIONS as e:
+            error = e
+        item.add_report_section("call", "stdout", output.getvalue())
+        reports.append(_phase(item, "call", started, error))
+
+        started, error = _now(), None
+        try:
+            try:
+                await prepared.__aexit__(None, None, None)
+            finally:
+                #### a failing teardown (e.g. --perf=enforce) must not leak the slot's context
+                await pool.release(slot)
+        except OUTCOME_EXCEPTIONS as e:
+            error = e
+        reports.append(_phase(item, "teardown", started, error))
+        return reports
+
+
+async def _run_all(items, session):
+    config = session.config
+    limit = asyncio.Semaphore(config.getoption("concurrency"))
+    archive = open_archive(config)
+    stdout = sys.stdout
+    sys.stdout = _TaskOutput(stdout)
+    try:
+        async with async_playwright() as playwright:
+            browser = await open_browser(playwright, config)
+            pool = None
+            try:
+                pool = await start_pool(browser, config, archive, size=config.getoption("concurrency"))
+                tasks = [asyncio.ensure_future(_run_one(item, pool, limit)) for item in items]
+                try:
+                    for finished in asyncio.as_completed(tasks):
+                        _log(config, await finished)
+                        if session.shouldfail or session.shouldstop:
+                            #### -x / --maxfail: drop the tests still running or waiting for a slot
+                            break
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                if pool is not None:
+                    await pool.close()
+                await browser.close()
+    finally:
+        sys.stdout = stdout
+        if archive is not None:
+            archive.save()
+
+
+def _log(config, reports):
+    item_nodeid = reports[0].nodeid
+    location = reports[0].location
+    config.hook.pytest_runtest_logstart(nodeid=item_nodeid, location=location)
+    for report in reports:
+        config.hook.pytest_runtest_logreport(report=report)
+    config.hook.pytest_runtest_logfinish(nodeid=item_nodeid, location=location)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    config = session.config
+    if config.getoption("concurrency") <= 1 or config.option.collectonly:
+        return None
+    if session.testsfailed and not config.option.continue_on_collection_errors:
+        raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+    concurrent = [item for item in session.items if is_concurrent(item)]
+    serial = [item for item in session.items if not is_concurrent(item)]
+    if concurrent:
+        asyncio.run(_run_all(concurrent, session))
+        if session.shouldfail:
+            raise session.Failed(session.shouldfail)
+        if session.shouldstop:
+            raise session.Interrupted(session.shouldstop)
+    for i, item in enumerate(serial):
+        nextitem = serial[i + 1] if i + 1 < len(serial) else None
+        item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+        if session.shouldfail:
+            raise session.Failed(session.shouldfail)
+        if session.shouldstop:
+            raise session.Interrupted(session.shouldstop)
+    return True
@@ -0,0 +1,218 @@
+"""Warm browser daemon: keep one Chromium running between pytest invocations.
+
+    python -m uitap.daemon start [--idle-timeout 1800] [--headed]
+    python -m uitap.daemon status
+    python -m uitap.daemon stop
+
+``start`` launches Chromium through Playwright in a detached process with a
+DevTools endpoint on 127.0.0.1 and writes it to ``.uitap/daemon.json``. The
+``browser`` fixture attaches to it with ``connect_over_cdp`` when the daemon
+answers its health check (and runs with the same headless setting), and
+launches in-process otherwise (or with ``--no-daemon``).
+
+Every attached pytest process leaves a lease file named after its pid in
+``.uitap/leases``. Contexts are created with dispose-on-detach, so Chromium
+drops them when a test process goes away, crashed or not; the daemon also
+disposes whatever contexts remain once no leased process is alive. After
+``--idle-timeout`` seconds without a live lease, or when the browser dies, the
+daemon exits and removes its state file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+STATE = Path(".uitap") / "daemon.json"
+LEASES = Path(".uitap") / "leases"
+LOG = Path(".uitap") / "daemon.log"
+IDLE_TIMEOUT = 1800
+TICK = 5
+HEALTH_TIMEOUT = 0.5
+CONNECT_TIMEOUT = 5000
+
+
+def read_state():
+    try:
+        return json.loads(STATE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def healthy(state) -> bool:
+    """The daemon process exists and its DevTools endpoint answers."""
+    if not state or not _alive(state["pid"]):
+        return False
+    try:
+        with urllib.request.urlopen(f"{state['endpoint']}/json/version", timeout=HEALTH_TIMEOUT) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def live_leases():
+    leases = []
+    for lease in LEASES.glob("*"):
+        if lease.name.isdigit() and _alive(int(lease.name)):
+            leases.append(int(lease.name))
+        else:
+            lease.unlink(missing_ok=True)
+    return leases
+
+
+#### client side, used by the browser fixture
+
+
+async def connect(playwright, launch_args):
+    """Browser of the running daemon, or None when there is no usable one."""
+    state = read_state()
+    if not healthy(state) or state["headless"] != launch_args.get("headless", True):
+        return None
+    try:
+        browser = await playwright.chromium.connect_over_cdp(state["endpoint"], timeout=CONNECT_TIMEOUT)
+    except Exception:
+        return None
+    LEASES.mkdir(parents=True, exist_ok=True)
+    lease = LEASES / str(os.getpid())
+    lease.touch()
+    browser.once("disconnected", lambda _: lease.unlink(missing_ok=True))
+    return browser
+
+
+#### daemon side
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _dispose_leftovers(cdp):
+    contexts = (await cdp.send("Target.getBrowserContexts"))["browserContextIds"]
+    for context_id in contexts:
+        await cdp.send("Target.disposeBrowserContext", {"browserContextId": context_id})
+    return len(contexts)
+
+
+async def serve(headless, idle_timeout):
+    from playwright.async_api import async_playwright
+
+    port = _free_port()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(
+            headless=headless, args=[f"--remote-debugging-port={port}", "--remote-debugging-address=127.0.0.1"])
+        browser.once("disconnected", lambda _: stop.set())
+        cdp = await browser.new_browser_cdp_session()
+        STATE.parent.mkdir(parents=True, exist_ok=True)
+        STATE.write_text(json.dumps({"pid": os.getpid(), "endpoint": f"http://127.0.0.1:{port}",
+                                     "headless": headless, "started": time.time()}), encoding="utf-8")
+        last_used = time.monotonic()
+        try:
+            while not stop.is_set():
+                if live_leases():
+                    last_used = time.monotonic()
+                elif await _dispose_leftovers(cdp):
+                    print("disposed contexts left behind by a finished test process", flush=True)
+                if time.monotonic() - last_used > idle_timeout:
+                    print(f"idle for {idle_timeout} s, shutting down", flush=True)
+                    break
+                try:
+                    await asyncio.wait_for(stop.wait(), TICK)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            STATE.unlink(missing_ok=True)
+            if browser.is_connected():
+                await browser.close()
+
+
+#### command line
+
+
+def start(args):
+    state = read_state()
+    if healthy(state):
+        print(f"already running: pid {state['pid']}, {state['endpoint']}")
+        return 0
+    STATE.unlink(missing_ok=True)
+    LOG.parent.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, "-m", "uitap.daemon", "serve", f"--idle-timeout={args.idle_timeout}"]
+    if args.headed:
+        command.append("--headed")
+    with open(LOG, "a", encoding="utf-8") as log:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        state = read_state()
+        if healthy(state):
+            print(f"started: pid {state['pid']}, {state['endpoint']}")
+            return 0
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    print(f"the daemon did not come up, see {LOG}")
+    return 1
+
+
+def stop(args):
+    state = read_state()
+    if not state or not _alive(state["pid"]):
+        STATE.unlink(missing_ok=True)
+        print("not running")
+        return 0
+    os.kill(state["pid"], signal.SIGTERM)
+    deadline = time.monotonic() + 10
+    while _alive(state["pid"]) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    print(f"stopped pid {state['pid']}")
+    return 0
+
+
+def status(args):
+    state = read_state()
+    if not healthy(state):
+        print("not running")
+        return 1
+    uptime = time.time() - state["started"]
+    print(f"running: pid {state['pid']}, {state['endpoint']}, "
+          f"{'headless' if state['headless'] else 'headed'}, up {uptime:.0f} s, "
+          f"{len(live_leases())} attached test process(es)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m uitap.daemon", description=__doc__.split("\n")[0])
+    parser.add_argument("command", choices=("start", "stop", "status", "serve"))
+    parser.add_argument("--idle-timeout", type=int, default=IDLE_TIMEOUT,
+                        help=f"exit after this many seconds without an attached test process (default: {IDLE_TIMEOUT})")
+    parser.add_argument("--headed", action="store_true", help="run the browser headed (use with pytest --headed)")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        asyncio.run(serve(not args.headed, args.idle_timeout))
+        return 0
+    return {"start": start, "stop": stop, "status": status}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
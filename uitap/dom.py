@@ -0,0 +1,46 @@
+"""Bulk reads of DOM structures in a single in-page evaluation."""
+from playwright.async_api import Locator
+
+_TABLE_JS = """(root) => {
+    const text = el => el.textContent.trim();
+    const headers = [], rows = [];
+    for (const row of root.querySelectorAll('[role="row"]')) {
+        const heads = row.querySelectorAll('[role="columnheader"]');
+        if (heads.length) {
+            if (!headers.length) headers.push(...Array.from(heads, text));
+            continue;
+        }
+        const cells = row.querySelectorAll('[role="cell"]');
+        if (cells.length) rows.push(Array.from(cells, text));
+    }
+    return {headers, rows};
+}"""
+
+
+class TableSnapshot:
+    """Text of an ARIA grid: header row plus data rows, keyed by the first cell of each row."""
+
+    def __init__(self, headers, rows):
+        self.headers = headers
+        self.rows = rows
+        self.columns = {name: i for i, name in enumerate(headers)}
+        self._rows_by_key = {row[0]: row for row in rows if row}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def row(self, key):
+        return dict(zip(self.headers, self._rows_by_key[key]))
+
+    def cell(self, key, column):
+        return self._rows_by_key[key][self.columns[column]]
+
+    def column(self, name):
+        index = self.columns[name]
+        return [row[index] for row in self.rows]
+
+
+async def read_table(table: Locator) -> TableSnapshot:
+    """Snapshot a ``role="row"``/``role="columnheader"``/``role="cell"`` grid with one round trip."""
+    data = await table.evaluate(_TABLE_JS)
+    return TableSnapshot(data["headers"], data["rows"])
@@ -0,0 +1,19 @@
+"""Exclusive lock next to a state file that several pytest processes (shard workers) save at the same time."""
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def locked(path):
+    """Hold ``<path>.lock`` while the block runs; no locking where fcntl is not available."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f"{path.name}.lock"), "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
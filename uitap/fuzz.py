@@ -0,0 +1,126 @@
+"""pytest plugin and helpers: generated-input runs of the form pages (``--fuzz N``).
+
+``inputs(kind, n, seed)`` yields Faker values from several locales mixed with
+hand-picked edge cases (non-breaking and other unusual spaces, combining
+characters, emoji, markup, very long strings). A fuzz test pushes every case
+through one page, resetting it in place between cases, and hands failing
+cases to ``shrink`` which removes and simplifies characters for as long as the
+case still fails, down to a minimal reproducer.
+
+Tests marked ``@pytest.mark.fuzz`` are skipped unless ``--fuzz N`` (cases per
+test) is given; ``--fuzz-seed`` makes a run reproducible. The terminal summary
+lists cases per second for every fuzz test.
+"""
+import random
+import time
+
+import pytest
+from faker import Faker
+
+LOCALES = ["en_US", "de_DE", "ru_RU", "ja_JP", "zh_CN", "ar_AA", "hi_IN"]
+EDGE_CASES = [
+    "My\u00a0Button", "\u00a0", "a\u00a0\u00a0b", "\u00a0leading", "trailing\u00a0", "en\u2002space",
+    "tab\there", "zero\u200bwidth", "e\u0301", "\U0001F600", "\U0001F469\u200d\U0001F4BB", "<b>bold</b>",
+    "&amp;", "'\"", "\\", "x" * 300,
+]
+#### characters a shrunk case is simplified to, in order of preference
+SIMPLE = "a "
+
+_throughput = {}
+
+
+def inputs(kind, n, seed):
+    """``n`` values of ``kind`` ("username", "password" or "text"); every 8th one is an edge case."""
+    fake = Faker(LOCALES)
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    makers = {
+        "username": lambda: rng.choice([fake.user_name, fake.first_name, fake.name])(),
+        "password": lambda: fake.password(length=rng.randint(4, 24), special_chars=rng.random() < 0.5),
+        "text": lambda: rng.choice([fake.word, fake.sentence, fake.catch_phrase, fake.name])(),
+    }
+    for i in range(n):
+        yield EDGE_CASES[(i // 8) % len(EDGE_CASES)] if i % 8 == 7 else makers[kind]()
+
+
+async def shrink(case, fails, max_attempts=500):
+    """Smallest variant of ``case`` (a tuple of strings) for which ``await fails(variant)`` stays true."""
+    case = tuple(case)
+    attempts = 0
+
+    async def still_fails(candidate):
+        nonlocal attempts
+        attempts += 1
+        return candidate != case and await fails(candidate)
+
+    improved = True
+    while improved and attempts < max_attempts:
+        improved = False
+        for field, value in enumerate(case):
+            #### drop chunks, halving their size, then simplify single characters
+            size = max(len(value) // 2, 1)
+            while size >= 1 and attempts < max_attempts:
+                start = 0
+                while start < len(case[field]) and attempts < max_attempts:
+                    value = case[field]
+                    candidate = case[:field] + (value[:start] + value[start + size:],) + case[field + 1:]
+                    if await still_fails(candidate):
+                        case, improved = candidate, True
+                    else:
+                        start += size
+                size //= 2
+            for i, char in enumerate(case[field]):
+                for simple in SIMPLE:
+                    if char == simple or attempts >= max_attempts:
+                        break
+                    value = case[field]
+                    candidate = case[:field] + (value[:i] + simple + value[i + 1:],) + case[field + 1:]
+                    if await still_fails(candidate):
+                        case, improved = candidate, True
+                        break
+    return case
+
+
+class Throughput:
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+        self.cases = 0
+        self._started = time.perf_counter()
+        self.seconds = 0.0
+
+    def done(self, cases):
+        self.cases = cases
+        self.seconds = time.perf_counter() - self._started
+        _throughput[self.nodeid] = self
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--fuzz", type=int, default=0, metavar="N",
+                    help="run the fuzz tests with N generated cases each (default: 0, fuzz tests skipped)")
+    group.addoption("--fuzz-seed", type=int, default=None, metavar="SEED",
+                    help="seed of the generated inputs (default: a new one per run, printed in the summary)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "fuzz: generated-input test, runs only with --fuzz N")
+    if config.getoption("fuzz_seed") is None:
+        config.option.fuzz_seed = random.randrange(2 ** 32)
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("fuzz"):
+        return
+    skip = pytest.mark.skip(reason="fuzz test, run with --fuzz N")
+    for item in items:
+        if item.get_closest_marker("fuzz"):
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _throughput:
+        return
+    terminalreporter.write_sep("-", f"fuzz (seed {config.getoption('fuzz_seed')})")
+    for nodeid, t in _throughput.items():
+        rate = t.cases / t.seconds if t.seconds else 0.0
+        terminalreporter.write_line(f"{t.cases:7d} cases  {t.seconds:7.1f} s  {rate:7.1f} cases/s  {nodeid}")
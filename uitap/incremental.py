@@ -0,0 +1,243 @@
+"""pytest plugin: skip tests whose pages and code did not change since they last passed (``--incremental``).
+
+Every run records the routes each test's page navigated to. With
+``--incremental`` the routes of the known tests are fetched first over one
+pooled ``requests.Session`` (HTML plus same-origin scripts, concurrently) and
+hashed. A test is skipped when it passed before with
+
+* the same hashes of all its routes,
+* the same test module file (helpers and module-level data included) and test id,
+* the same ``conftest.py`` and ``uitap`` package (any change there reruns everything).
+
+Tests on a module's shared page use the routes recorded for the module. Pages
+whose HTML changes on every request (e.g. /dynamicid) never match, so their
+tests always run. Once ``--full-run-after`` hours passed since the last full
+run, nothing is skipped. State lives in ``.uitap/incremental.json`` per target site.
+With ``--processes N`` the workers send each test's routes along with its
+teardown report and only the coordinator saves the state.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import pytest
+import requests
+from playwright.async_api import Page
+
+from uitap import session, static
+
+STATE = Path(".uitap") / "incremental.json"
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 10
+
+_routes = {}
+_outcomes = {}
+_deselected = False
+_run = None
+
+
+class _Scripts(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.sources = []
+
+    def handle_starttag(self, tag, attrs):
+        src = dict(attrs).get("src")
+        if tag == "script" and src:
+            self.sources.append(src)
+
+
+class RouteHasher:
+    """Hashes of route HTML and the scripts it loads, fetched over one connection pool."""
+
+    def __init__(self, base):
+        self.base = base
+        self.session = static.pooled_session(FETCH_WORKERS)
+        self._scripts = {}
+
+    def _get(self, url):
+        response = self.session.get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
+    def _script(self, url):
+        if url not in self._scripts:
+            self._scripts[url] = hashlib.sha256(self._get(url)).hexdigest()
+        return self._scripts[url]
+
+    def route(self, route):
+        try:
+            html = self._get(urljoin(self.base, route))
+            parser = _Scripts()
+            parser.feed(html.decode("utf-8", "replace"))
+            digest = hashlib.sha256(html)
+            for src in parser.sources:
+                url = urljoin(urljoin(self.base, route), src)
+                if urlsplit(url).netloc == urlsplit(self.base).netloc:
+                    digest.update(self._script(url).encode())
+            return digest.hexdigest()
+        except requests.RequestException:
+            return None
+
+    def routes(self, routes):
+        with ThreadPoolExecutor(FETCH_WORKERS) as pool:
+            return dict(zip(routes, pool.map(self.route, routes)))
+
+    def close(self):
+        self.session.close()
+
+
+def code_hash(root):
+    digest = hashlib.sha256()
+    for path in [root / "conftest.py", *sorted((root / "uitap").glob("*"))]:
+        if path.is_file() and path.suffix in (".py", ".json"):
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def source_hash(item):
+    """The whole test module (helpers and module-level data included) plus the test id; uitap/ is in ``code_hash``."""
+    try:
+        source = hashlib.sha256(Path(item.path).read_bytes()).hexdigest()
+    except OSError:
+        source = ""
+    return hashlib.sha256(f"{source}\0{item.nodeid}".encode()).hexdigest()
+
+
+def _module(nodeid):
+    return nodeid.split("::")[0]
+
+
+class _Run:
+    def __init__(self, config):
+        self.path = Path(config.getoption("incremental_state"))
+        self.site = session.base_url(config)
+        try:
+            self.store = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.store = {}
+        self.state = self.store.setdefault(self.site, {"last_full": 0, "code": None, "tests": {}})
+        self.code = code_hash(config.rootpath)
+        self.full = (time.time() - self.state["last_full"] > config.getoption("full_run_after") * 3600
+                     or self.code != self.state["code"])
+        self.hashes = {}
+        self.skipped = []
+
+    def select(self, items):
+        known = self.state["tests"]
+        wanted = {route for item in items if item.nodeid in known for route in known[item.nodeid]["routes"]}
+        hasher = RouteHasher(self.site)
+        try:
+            self.hashes = hasher.routes(sorted(wanted))
+        finally:
+            hasher.close()
+        for item in items:
+            entry = known.get(item.nodeid)
+            if (entry and entry["routes"] and entry["test"] == source_hash(item)
+                    and all(self.hashes.get(r) is not None and self.hashes[r] == h for r, h in entry["routes"].items())):
+                item.add_marker(pytest.mark.skip(reason="incremental: pages and code unchanged since last pass"))
+                self.skipped.append(item.nodeid)
+
+    def save(self, items, ran_everything):
+        tests = self.state["tests"]
+        for item in items:
+            if item.nodeid in self.skipped:
+                continue
+            routes = _routes.get(item.nodeid) or _routes.get(_module(item.nodeid))
+            if _outcomes.get(item.nodeid) != "passed" or not routes:
+                tests.pop(item.nodeid, None)
+                continue
+            missing = sorted(r for r in routes if r not in self.hashes)
+            if missing:
+                hasher = RouteHasher(self.site)
+                try:
+                    self.hashes.update(hasher.routes(missing))
+                finally:
+                    hasher.close()
+            tests[item.nodeid] = {"test": source_hash(item), "routes": {r: self.hashes[r] for r in sorted(routes)}}
+        self.state["code"] = self.code
+        if ran_everything:
+            self.state["last_full"] = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.store, indent=1, sort_keys=True), encoding="utf-8")
+
+
+@asynccontextmanager
+async def prepared(page: Page, item):
+    site = urlsplit(session.base_url(item.config)).netloc
+    visited = _routes.setdefault(item.nodeid, set())
+
+    def on_navigated(frame):
+        url = urlsplit(frame.url)
+        if frame == page.main_frame and url.netloc == site:
+            visited.add(url.path or "/")
+    page.on("framenavigated", on_navigated)
+    yield page
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--incremental", action="store_true",
+                    help="skip tests whose pages (HTML and scripts) and code are unchanged since they last passed")
+    group.addoption("--full-run-after", type=float, default=24.0, metavar="HOURS",
+                    help="with --incremental, run everything when the last full run is older than this (default: 24)")
+    group.addoption("--incremental-state", default=str(STATE), metavar="PATH",
+                    help=f"route hashes and results of earlier runs (default: {STATE})")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    global _run
+    if not config.getoption("incremental") or config.option.collectonly:
+        return
+    _run = _Run(config)
+    if not _run.full:
+        _run.select(items)
+
+
+def pytest_deselected(items):
+    global _deselected
+    _deselected = _deselected or bool(items)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = (yield).get_result()
+    if _run is None or call.when != "teardown" or not item.config.getoption("shard_worker", None):
+        return
+    #### shard worker: the coordinator saves the state, it gets the routes with the report
+    for key in (item.nodeid, _module(item.nodeid)):
+        if key in _routes:
+            report.user_properties.append(("uitap_routes", [key, sorted(_routes[key])]))
+
+
+def pytest_runtest_logreport(report):
+    for name, value in report.user_properties:
+        if name == "uitap_routes":
+            key, routes = value
+            _routes.setdefault(key, set()).update(routes)
+    if report.outcome != "passed":
+        _outcomes[report.nodeid] = report.outcome
+    elif report.when == "call":
+        _outcomes.setdefault(report.nodeid, "passed")
+
+
+def pytest_sessionfinish(session):
+    if _run is not None and not session.config.getoption("shard_worker", None):
+        _run.save(session.items, ran_everything=_run.full and not _deselected)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _run is None:
+        return
+    terminalreporter.write_sep("-", "incremental")
+    if _run.full:
+        terminalreporter.write_line("full run (schedule or code change), nothing skipped")
+    else:
+        terminalreporter.write_line(f"{len(_run.skipped)} unchanged tests skipped, "
+                                    f"{len(_run.hashes)} routes hashed")
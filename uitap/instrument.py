@@ -0,0 +1,191 @@
+"""pytest plugin: wall time of every Playwright action the tests make.
+
+``Page``, ``Locator``, ``Mouse`` and ``expect`` assertion coroutines are wrapped
+once per session. Each finished call becomes a record::
+
+    {"test": nodeid, "action": "Locator.click", "selector": "...",
+     "ms": 12.3, "ok": true, "retries": 0, "ts": 1700000000.0}
+
+and is passed to every registered listener. ``--action-log PATH`` streams the
+records to a JSONL file and prints the slowest actions/selectors at the end of
+the session. ``retries`` is the number of polling attempts Playwright reports
+in the call log of a failed action; it is 0 for actions that succeeded.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import re
+import time
+
+import pytest
+from playwright.async_api import Locator, LocatorAssertions, Mouse, Page, PageAssertions
+
+WRAPPED = {
+    Page: ("goto", "reload", "go_back", "wait_for_load_state", "wait_for_url", "evaluate",
+           "wait_for_timeout", "screenshot"),
+    Locator: ("click", "dblclick", "fill", "type", "press", "hover", "focus", "check", "set_checked",
+              "select_option", "set_input_files", "get_attribute", "text_content", "inner_text",
+              "input_value", "count", "bounding_box", "scroll_into_view_if_needed", "evaluate",
+              "evaluate_all", "element_handle"),
+    Mouse: ("click", "wheel", "move"),
+    PageAssertions: None,
+    LocatorAssertions: None,
+}
+
+_RETRIES = re.compile(r"(\d+) × ")
+
+#### node id of the test an action belongs to; a context variable so concurrently running tests stay apart
+current_test = contextvars.ContextVar("uitap_current_test", default=None)
+#### set in uitap's own tasks (e.g. flight recorder screenshots), whose actions are not recorded
+internal = contextvars.ContextVar("uitap_internal", default=False)
+
+_listeners = []
+_originals = []
+
+
+def add_listener(listener):
+    """Call ``listener(record)`` after every wrapped action; patches Playwright on first use."""
+    if not _originals:
+        _install()
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    _listeners.remove(listener)
+    if not _listeners:
+        _uninstall()
+
+
+def describe(target, args) -> str:
+    impl = getattr(target, "_impl_obj", None)
+    selector = getattr(impl, "_selector", None)
+    if selector is None:
+        selector = getattr(getattr(impl, "_actual_locator", None), "_selector", None)
+    if selector is None and isinstance(target, Page) and args and isinstance(args[0], str):
+        selector = args[0]
+    if selector is None and isinstance(target, PageAssertions) and args:
+        #### to_have_title / to_have_url: the expected value tells the pages apart
+        expected = args[0]
+        selector = getattr(expected, "pattern", expected) if isinstance(expected, (str, re.Pattern)) else None
+    return selector or ""
+
+
+def _retries(error) -> int:
+    counts = [int(n) for n in _RETRIES.findall(str(error))] if error is not None else []
+    return max(counts, default=0)
+
+
+def _emit(action, target, args, started, error):
+    if internal.get():
+        return
+    record = {
+        "test": current_test.get(),
+        "action": action,
+        "selector": describe(target, args),
+        "ms": round((time.perf_counter() - started) * 1000, 3),
+        "ok": error is None,
+        "retries": _retries(error),
+        "ts": time.time(),
+    }
+    for listener in _listeners:
+        listener(record)
+
+
+def _wrap(cls, name):
+    original = getattr(cls, name)
+    action = f"{cls.__name__}.{name}"
+
+    @functools.wraps(original)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = await original(self, *args, **kwargs)
+        except Exception as e:
+            _emit(action, self, args, started, e)
+            raise
+        _emit(action, self, args, started, None)
+        return result
+    _originals.append((cls, name, original))
+    setattr(cls, name, wrapper)
+
+
+def _install():
+    for cls, names in WRAPPED.items():
+        if names is None:
+            names = [n for n in dir(cls) if n.startswith(("to_", "not_to_"))]
+        for name in names:
+            if inspect.iscoroutinefunction(getattr(cls, name, None)):
+                _wrap(cls, name)
+
+
+def _uninstall():
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+
+
+class ActionLog:
+    """Listener writing records to a JSONL file and keeping per action/selector totals."""
+
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8", buffering=1 << 16)
+        self.totals = {}
+
+    def __call__(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        key = (record["action"], record["selector"])
+        count, total, slowest = self.totals.get(key, (0, 0.0, 0.0))
+        self.totals[key] = (count + 1, total + record["ms"], max(slowest, record["ms"]))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def slowest(self, n):
+        ranked = sorted(self.totals.items(), key=lambda item: item[1][1], reverse=True)
+        return ranked[:n]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--action-log", default=None, metavar="PATH",
+                    help="write the wall time of every Playwright action to PATH (JSONL) and report the slowest")
+    group.addoption("--action-summary", type=int, default=15, metavar="N",
+                    help="number of action/selector pairs in the slowest-actions report (default: 15)")
+
+
+def pytest_configure(config):
+    path = config.getoption("action_log")
+    if path:
+        config._uitap_action_log = ActionLog(path)
+        add_listener(config._uitap_action_log)
+
+
+def pytest_unconfigure(config):
+    log = getattr(config, "_uitap_action_log", None)
+    if log is not None:
+        remove_listener(log)
+        log.close()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    token = current_test.set(item.nodeid)
+    yield
+    current_test.reset(token)
+    log = getattr(item.config, "_uitap_action_log", None)
+    if log is not None:
+        log.flush()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    log = getattr(config, "_uitap_action_log", None)
+    if log is None or not log.totals:
+        return
+    terminalreporter.write_sep("-", "slowest actions (total time)")
+    for (action, selector), (count, total, slowest) in log.slowest(config.getoption("action_summary")):
+        terminalreporter.write_line(
+            f"{total:9.0f} ms  {count:4d}x  max {slowest:7.0f} ms  {action}  {selector}")
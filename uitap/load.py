@@ -0,0 +1,220 @@
+"""pytest plugin: load and soak mode, the selected tests as virtual users (``--load M``).
+
+    pytest test_ui_playground.py --load 20 --load-duration 600 --base-url http://localhost:8080 \\
+        -k "sample_app or text_input or file_upload or auto_wait"
+
+Instead of running the tests once, M virtual users repeat the selected tests
+(round robin, each user starting at a different one) until the duration is
+over. They share one browser and a pool of M contexts, like ``--concurrency``;
+``shared_page`` tests get a fresh shared page per iteration, and tests that
+cannot run concurrently (other fixtures, ``serial``) are left out.
+No per-iteration reports are made; the summary has throughput, latency
+percentiles of the test flow itself (the wait for a pool context and the page
+preparation are reported separately as "wait") and error rates per test, and a
+memory series sampled every
+``--load-sample`` seconds: RSS of this Python process, RSS of the processes it
+started (Playwright driver and browser) and the number of open contexts/pages.
+Steady growth over a soak run points at a leak; the summary prints the trend
+in MiB per minute. ``--load-report PATH`` writes everything as JSON. The run
+fails when the error rate is above ``--load-max-error-rate``.
+"""
+import asyncio
+import contextlib
+import inspect
+import io
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from playwright.async_api import async_playwright
+
+from uitap import memory
+from uitap.bench import percentile
+from uitap.concurrent import OUTCOME_EXCEPTIONS, is_concurrent
+from uitap.instrument import current_test
+from uitap.session import open_archive, open_browser, prepared as prepared_page, start_pool
+from uitap.snapshot import SharedPage
+
+#### a virtual user reaches shared_page states itself, on its own page
+_FIXTURES = {"page", "shared_page"}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--load", type=int, default=0, metavar="M",
+                    help="load/soak mode: M virtual users repeat the selected tests for --load-duration seconds")
+    group.addoption("--load-duration", type=float, default=60, metavar="SECONDS",
+                    help="length of the load run (default: 60)")
+    group.addoption("--load-sample", type=float, default=5, metavar="SECONDS",
+                    help="interval of the memory samples (default: 5)")
+    group.addoption("--load-report", default=None, metavar="PATH",
+                    help="write throughput, latencies, errors and the memory series to PATH (JSON)")
+    group.addoption("--load-max-error-rate", type=float, default=0.01, metavar="RATE",
+                    help="fail the run above this share of failed iterations (default: 0.01)")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if config.getoption("load"):
+        #### per-iteration screenshots would be part of what is measured
+        config.option.flight_recorder = 0
+
+
+def trend(points):
+    """Least-squares slope of (x, y) points, 0 with fewer than two."""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+
+
+class LoadRun:
+    def __init__(self, items, config):
+        self.items = items
+        self.config = config
+        self.users = config.getoption("load")
+        self.duration = config.getoption("load_duration")
+        self.latencies = {item.nodeid: [] for item in items}
+        self.waits = {item.nodeid: [] for item in items}
+        self.errors = {item.nodeid: Counter() for item in items}
+        self.memory = []
+        self.elapsed = 0.0
+
+    async def _iteration(self, item, pool):
+        current_test.set(item.nodeid)
+        params = getattr(getattr(item, "callspec", None), "params", {})
+        waited = time.perf_counter()
+        slot = flow = None
+        try:
+            slot = await pool.acquire()
+            async with prepared_page(slot.page, item) as page:
+                arguments = dict(params, page=page, shared_page=SharedPage(page))
+                #### latency is the flow only: waiting for a (replacement) context and preparing the page are not
+                started = time.perf_counter()
+                self.waits[item.nodeid].append(started - waited)
+                await item.obj(**{name: arguments[name] for name in inspect.signature(item.obj).parameters})
+                flow = time.perf_counter() - started
+        except OUTCOME_EXCEPTIONS as e:
+            message = str(e).strip().splitlines()
+            self.errors[item.nodeid][f"{type(e).__name__}: {message[0] if message else ''}"[:200]] += 1
+        else:
+            self.latencies[item.nodeid].append(flow)
+        finally:
+            if slot is not None:
+                await pool.release(slot)
+
+    async def _user(self, index, pool, deadline):
+        n = index
+        while time.monotonic() < deadline:
+            await self._iteration(self.items[n % len(self.items)], pool)
+            n += 1
+
+    async def _sample(self, browser, started):
+        while True:
+            python_kb, browser_kb = memory.sample()
+            contexts = browser.contexts
+            self.memory.append({"t": round(time.monotonic() - started, 1), "python_kb": python_kb,
+                                "browser_kb": browser_kb, "contexts": len(contexts),
+                                "pages": sum(len(c.pages) for c in contexts)})
+            await asyncio.sleep(self.config.getoption("load_sample"))
+
+    async def run(self):
+        archive = open_archive(self.config)
+        async with async_playwright() as playwright:
+            browser = await open_browser(playwright, self.config)
+            pool = sampler = None
+            try:
+                pool = await start_pool(browser, self.config, archive, size=self.users)
+                started = time.monotonic()
+                sampler = asyncio.ensure_future(self._sample(browser, started))
+                await asyncio.gather(*(self._user(i, pool, started + self.duration) for i in range(self.users)))
+                self.elapsed = time.monotonic() - started
+            finally:
+                if sampler is not None:
+                    sampler.cancel()
+                if pool is not None:
+                    await pool.close()
+                await browser.close()
+        if archive is not None:
+            archive.save()
+
+    def result(self):
+        tests = {}
+        for nodeid, latencies in self.latencies.items():
+            errors = sum(self.errors[nodeid].values())
+            entry = {"iterations": len(latencies) + errors, "errors": errors,
+                     "per_s": (len(latencies) + errors) / self.elapsed if self.elapsed else 0.0,
+                     "top_errors": self.errors[nodeid].most_common(3)}
+            if latencies:
+                entry.update({f"p{p}_ms": percentile(latencies, p) * 1000 for p in (50, 95, 99)})
+            if self.waits[nodeid]:
+                entry["wait_p95_ms"] = percentile(self.waits[nodeid], 95) * 1000
+            tests[nodeid] = entry
+        iterations = sum(t["iterations"] for t in tests.values())
+        errors = sum(t["errors"] for t in tests.values())
+        per_minute = [(m["t"] / 60, m) for m in self.memory]
+        return {
+            "users": self.users,
+            "duration_s": self.elapsed,
+            "iterations": iterations,
+            "per_s": iterations / self.elapsed if self.elapsed else 0.0,
+            "error_rate": errors / iterations if iterations else 0.0,
+            "tests": tests,
+            "memory": self.memory,
+            "python_mib_per_min": trend([(t, m["python_kb"] / 1024) for t, m in per_minute]),
+            "browser_mib_per_min": trend([(t, m["browser_kb"] / 1024) for t, m in per_minute]),
+        }
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    config = session.config
+    if not config.getoption("load") or config.option.collectonly:
+        return None
+    if session.testsfailed and not config.option.continue_on_collection_errors:
+        raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+    items = [item for item in session.items if is_concurrent(item, _FIXTURES)]
+    config._uitap_load_left_out = [item.nodeid for item in session.items if not is_concurrent(item, _FIXTURES)]
+    if not items:
+        raise pytest.UsageError("--load: none of the selected tests can run concurrently (page/shared_page fixtures only, not serial)")
+    run = LoadRun(items, config)
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(run.run())
+    result = config._uitap_load_result = run.result()
+    path = config.getoption("load_report")
+    if path:
+        Path(path).write_text(json.dumps(result, indent=1), encoding="utf-8")
+    if result["error_rate"] > config.getoption("load_max_error_rate"):
+        session.testsfailed = sum(t["errors"] for t in result["tests"].values())
+    return True
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    result = getattr(config, "_uitap_load_result", None)
+    if result is None:
+        return
+    write = terminalreporter.write_line
+    terminalreporter.write_sep("-", f"load: {result['users']} users, {result['duration_s']:.0f} s")
+    write(f"{result['iterations']} iterations, {result['per_s']:.2f}/s, error rate {result['error_rate']:.2%}")
+    write(f"{'per s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'wait p95':>9} {'errors':>7}  test")
+    for nodeid, t in sorted(result["tests"].items()):
+        write(f"{t['per_s']:7.2f} {t.get('p50_ms', 0):8.0f} {t.get('p95_ms', 0):8.0f} {t.get('p99_ms', 0):8.0f} "
+              f"{t.get('wait_p95_ms', 0):9.0f} {t['errors']:7d}  {nodeid}")
+        for message, count in t["top_errors"]:
+            write(f"{'':>53}{count}x {message}")
+    if result["memory"]:
+        first, last = result["memory"][0], result["memory"][-1]
+        peak = max(m["browser_kb"] for m in result["memory"])
+        write(f"python RSS {first['python_kb'] / 1024:.0f} -> {last['python_kb'] / 1024:.0f} MiB "
+              f"({result['python_mib_per_min']:+.1f} MiB/min), browser RSS {first['browser_kb'] / 1024:.0f} -> "
+              f"{last['browser_kb'] / 1024:.0f} MiB, peak {peak / 1024:.0f} "
+              f"({result['browser_mib_per_min']:+.1f} MiB/min), open contexts/pages at the end "
+              f"{last['contexts']}/{last['pages']}")
+    left_out = getattr(config, "_uitap_load_left_out", [])
+    if left_out:
+        write(f"left out (not concurrent-safe): {', '.join(left_out)}")
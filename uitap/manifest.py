@@ -0,0 +1,32 @@
+"""Playground page manifest (``pages.json``): overview heading, link and document title of every page.
+
+Adding a page to the playground only needs a new entry in ``pages.json``.
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+MANIFEST = Path(__file__).with_name("pages.json")
+
+
+@dataclass(frozen=True)
+class PlaygroundPage:
+    heading: str
+    href: str
+    title: str
+
+
+def _load(path=MANIFEST):
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    landing = PlaygroundPage(heading=None, **data["landing"])
+    return landing, tuple(PlaygroundPage(**page) for page in data["pages"])
+
+
+LANDING, PAGES = _load()
+
+
+def page_for(href) -> PlaygroundPage:
+    for page in (LANDING,) + PAGES:
+        if page.href == href:
+            return page
+    raise KeyError(href)
@@ -0,0 +1,48 @@
+"""Resident memory of this process and of the browser processes it started, from /proc (Linux)."""
+import os
+from pathlib import Path
+
+_PROC = Path("/proc")
+
+
+def rss_kb(pid) -> int:
+    """VmRSS of ``pid`` in KiB, 0 when the process is gone or /proc is not available."""
+    try:
+        for line in (_PROC / str(pid) / "status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _parents():
+    parents = {}
+    for entry in _PROC.iterdir() if _PROC.is_dir() else ():
+        if not entry.name.isdigit():
+            continue
+        try:
+            #### the command name in field 2 may contain spaces and parentheses, the rest follows the last ")"
+            fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        parents[int(entry.name)] = int(fields[1])
+    return parents
+
+
+def descendants(pid=None):
+    pid = os.getpid() if pid is None else pid
+    children = {}
+    for child, parent in _parents().items():
+        children.setdefault(parent, []).append(child)
+    found, stack = [], list(children.get(pid, ()))
+    while stack:
+        child = stack.pop()
+        found.append(child)
+        stack.extend(children.get(child, ()))
+    return found
+
+
+def sample():
+    """(python KiB, browser KiB): this process, and everything it spawned (Playwright driver and browsers)."""
+    return rss_kb(os.getpid()), sum(rss_kb(child) for child in descendants())
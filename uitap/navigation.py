@@ -0,0 +1,126 @@
+"""pytest plugin: how tests reach a playground page, and which resources a page may load.
+
+``open_page(page, "/autowait")`` goes straight to the route (``--navigation=direct``,
+the default) or, with ``--navigation=click``, loads the landing page and clicks
+the link as the tests used to. The landing-page click-through itself is covered
+by a dedicated test.
+
+Images, fonts, media and third-party analytics are aborted by a page route
+unless the test is marked ``@pytest.mark.resources`` or ``--allow-resources`` is
+given. Other requests fall back to the context routes (record/replay).
+``--navigation-stats`` counts the bytes and requests of every test so the
+modes can be compared.
+"""
+import asyncio
+import statistics
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from playwright.async_api import Error, Page, Route
+
+BLOCKED_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net",
+                 "googlesyndication.com", "googleadservices.com", "facebook.net", "hotjar.com")
+
+_mode = "direct"
+_stats = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--navigation", choices=("direct", "click"), default="direct",
+                    help="open pages by URL (direct) or through the landing page links (click)")
+    group.addoption("--allow-resources", action="store_true",
+                    help="do not block images, fonts and analytics for any test")
+    group.addoption("--navigation-stats", action="store_true",
+                    help="report bytes and requests per test")
+
+
+def pytest_configure(config):
+    global _mode
+    _mode = config.getoption("navigation")
+    config.addinivalue_line("markers", "resources: let the test load images, fonts and third-party analytics")
+
+
+async def open_page(page: Page, href, timeout=None):
+    if _mode == "click":
+        await page.goto("/", timeout=timeout)
+        await page.locator(f'a[href="{href}"]').click()
+    else:
+        await page.goto(href, timeout=timeout)
+
+
+def is_blocked(request) -> bool:
+    if request.resource_type in BLOCKED_TYPES:
+        return True
+    host = urlsplit(request.url).hostname or ""
+    return host.endswith(BLOCKED_HOSTS)
+
+
+class _PageStats:
+    def __init__(self):
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.duration = None
+        self._pending = set()
+
+    def watch(self, page: Page):
+        def on_finished(request):
+            task = asyncio.ensure_future(self._count(request))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        page.on("requestfinished", on_finished)
+
+    async def _count(self, request):
+        try:
+            sizes = await request.sizes()
+        except Error:
+            return
+        self.requests += 1
+        self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+    async def settle(self):
+        await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+@asynccontextmanager
+async def prepared(page: Page, item):
+    config = item.config
+    stats = _PageStats() if config.getoption("navigation_stats") else None
+    if not (config.getoption("allow_resources") or item.get_closest_marker("resources")):
+        async def block(route: Route):
+            if is_blocked(route.request):
+                if stats is not None:
+                    stats.blocked += 1
+                await route.abort("blockedbyclient")
+            else:
+                await route.fallback()
+        await page.route("**/*", block)
+    if stats is not None:
+        stats.watch(page)
+        _stats[item.nodeid] = stats
+    yield page
+    if stats is not None:
+        await stats.settle()
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "call" and report.nodeid in _stats:
+        _stats[report.nodeid].duration = report.duration
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _stats:
+        return
+    measured = [s for s in _stats.values() if s.duration is not None]
+    if not measured:
+        return
+    blocking = "resources allowed" if config.getoption("allow_resources") else "resources blocked"
+    terminalreporter.write_sep("-", f"navigation: {_mode}, {blocking}")
+    terminalreporter.write_line(
+        f"{len(measured)} tests, per test: "
+        f"{statistics.mean(s.bytes for s in measured) / 1024:.1f} KiB in "
+        f"{statistics.mean(s.requests for s in measured):.1f} requests "
+        f"({statistics.mean(s.blocked for s in measured):.1f} blocked), "
+        f"{statistics.mean(s.duration for s in measured) * 1000:.0f} ms test body")
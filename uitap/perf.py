@@ -0,0 +1,167 @@
+"""pytest plugin: page performance per route, checked against budgets (``--perf``).
+
+After every page load of a test (``goto``, ``reload``, link clicks) the page is
+asked for its Navigation Timing entry, first-contentful-paint and resource
+entries::
+
+    ttfb_ms  dcl_ms  load_ms  fcp_ms  transfer_kb  resources
+
+``--perf=report`` adds the numbers to the test report and appends them to
+``--perf-trend`` (CSV, one row per load, for plotting). ``--perf=enforce``
+also turns budget overruns into a teardown error of the test. Budgets live in
+``uitap/perf_budgets.json``: ``default`` limits, overridden per route path.
+Blocked resources (see ``uitap.navigation``) are not counted. On a module's
+shared page each load is credited to the test that was running, and checked at
+that test's teardown.
+"""
+import asyncio
+import csv
+import json
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from playwright.async_api import Error, Page
+
+from uitap import instrument
+
+BUDGETS = Path(__file__).with_name("perf_budgets.json")
+TREND = Path(".uitap") / "perf_trend.csv"
+METRICS = ("ttfb_ms", "dcl_ms", "load_ms", "fcp_ms", "transfer_kb", "resources")
+
+_METRICS_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) return null;
+    const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+    const resources = performance.getEntriesByType('resource');
+    const transfer = resources.reduce((total, r) => total + (r.transferSize || 0), nav.transferSize || 0);
+    return {
+        route: location.pathname,
+        ttfb_ms: nav.responseStart - nav.requestStart,
+        dcl_ms: nav.domContentLoadedEventEnd,
+        load_ms: nav.loadEventEnd || nav.loadEventStart,
+        fcp_ms: fcp ? fcp.startTime : null,
+        transfer_kb: transfer / 1024,
+        resources: resources.length,
+    };
+}"""
+
+_run_started = time.strftime("%Y-%m-%dT%H:%M:%S")
+_running = None
+#### shared pages: samples per test, picked up at the test's teardown
+_by_test = {}
+
+
+def load_budgets(path=BUDGETS):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def budget_for(budgets, route):
+    return {**budgets.get("default", {}), **budgets.get("routes", {}).get(route, {})}
+
+
+def overruns(sample, budget):
+    return [f"{sample['route']} {name} {sample[name]:.0f} > {limit}"
+            for name, limit in budget.items() if sample.get(name) is not None and sample[name] > limit]
+
+
+class _Collector:
+    def __init__(self, page: Page, shared=False):
+        self.page = page
+        self.samples = []
+        self.shared = shared
+        self._pending = set()
+        page.on("load", self._on_load)
+
+    def _on_load(self, _):
+        task = asyncio.ensure_future(self._collect(_running))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _collect(self, test):
+        instrument.internal.set(True)
+        try:
+            sample = await self.page.evaluate(_METRICS_JS)
+        except Error:
+            return
+        if sample is None:
+            return
+        sample = {name: round(v, 1) if isinstance(v, float) else v for name, v in sample.items()}
+        if self.shared:
+            _by_test.setdefault(test, []).append(sample)
+        else:
+            self.samples.append(sample)
+
+    async def settle(self):
+        await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+def _write_trend(path, nodeid, samples):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new = not path.exists()
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new:
+            writer.writerow(("run", "ts", "test", "route") + METRICS)
+        for sample in samples:
+            writer.writerow((_run_started, round(time.time(), 3), nodeid, sample["route"])
+                            + tuple(sample.get(name) for name in METRICS))
+
+
+def _report(item, samples):
+    config = item.config
+    budgets = load_budgets(config.getoption("perf_budgets"))
+    _write_trend(config.getoption("perf_trend"), item.nodeid, samples)
+    lines, exceeded = [], []
+    for sample in samples:
+        lines.append("  ".join([sample["route"]] + [f"{name}={sample[name]}" for name in METRICS]))
+        exceeded += overruns(sample, budget_for(budgets, sample["route"]))
+    item.add_report_section("teardown", "perf", "\n".join(lines + [f"over budget: {o}" for o in exceeded]))
+    if exceeded and config.getoption("perf") == "enforce":
+        raise AssertionError("performance budget exceeded: " + "; ".join(exceeded))
+
+
+@asynccontextmanager
+async def prepared(page: Page, item):
+    if item.config.getoption("perf") == "off":
+        yield page
+        return
+    #### a module-scoped shared page comes with the Module node, its loads belong to the tests using it
+    shared = not isinstance(item, pytest.Item)
+    collector = _Collector(page, shared)
+    yield page
+    await collector.settle()
+    if collector.samples:
+        _report(item, collector.samples)
+
+
+def pytest_runtest_logstart(nodeid):
+    global _running
+    _running = nodeid
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item):
+    #### after the fixtures, so the last test of a module also gets the loads settled by its shared page teardown
+    samples = _by_test.pop(item.nodeid, None)
+    if samples:
+        _report(item, samples)
+
+
+def pytest_sessionfinish(session):
+    #### loads that settled after their test's teardown only go to the trend file
+    for nodeid, samples in _by_test.items():
+        _write_trend(session.config.getoption("perf_trend"), nodeid or "", samples)
+    _by_test.clear()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--perf", choices=("off", "report", "enforce"), default="off",
+                    help="collect navigation timing, FCP and resources per page load; enforce: fail tests over budget")
+    group.addoption("--perf-budgets", default=str(BUDGETS), metavar="PATH",
+                    help="per-route performance budgets (default: uitap/perf_budgets.json)")
+    group.addoption("--perf-trend", default=str(TREND), metavar="PATH",
+                    help=f"CSV the per-load numbers are appended to (default: {TREND})")
@@ -0,0 +1,136 @@
+"""Pool of pre-warmed browser contexts shared by every test of a session.
+
+One browser process lives for the whole session (one per worker process). A
+test borrows a context that was created ahead of time, together with a blank
+page, and gives it back when it is done. By default a context is used once and
+a replacement is created in the background, which keeps the isolation of a
+brand new context while hiding its creation cost. With ``max_uses > 1`` a
+context is reset (pages, cookies, permissions, routes) and handed out again,
+unless it crashed or still holds storage it could not clear.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from playwright.async_api import Browser, BrowserContext, Error, Page
+
+
+class _Slot:
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.crashed = False
+
+
+class ContextPool:
+    def __init__(self, browser: Browser, size=2, max_uses=1, context_options=None):
+        self.browser = browser
+        self.size = max(size, 1)
+        self.max_uses = max(max_uses, 1)
+        self.context_options = dict(context_options or {})
+        self.created = 0
+        self._setup_hooks = []
+        self._ready = asyncio.Queue()
+        self._pending = set()
+        self._closed = False
+
+    def add_setup(self, hook):
+        """Register ``async hook(context)``, run on every new or reset context."""
+        self._setup_hooks.append(hook)
+
+    async def start(self):
+        await asyncio.gather(*(self._put_new() for _ in range(self.size)))
+
+    async def close(self):
+        self._closed = True
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        while not self._ready.empty():
+            slot = self._ready.get_nowait()
+            if isinstance(slot, _Slot):
+                await self._discard(slot)
+
+    @asynccontextmanager
+    async def page(self):
+        slot = await self.acquire()
+        try:
+            yield slot.page
+        finally:
+            await self.release(slot)
+
+    async def acquire(self) -> _Slot:
+        if self._ready.qsize() + len(self._pending) < 1:
+            self._refill()
+        slot = await self._ready.get()
+        if isinstance(slot, BaseException):
+            raise slot
+        slot.uses += 1
+        if slot.uses >= self.max_uses:
+            self._top_up()
+        return slot
+
+    async def release(self, slot: _Slot):
+        reusable = not (self._closed or slot.crashed) and slot.uses < self.max_uses
+        if reusable and self._ready.qsize() < self.size and await self._reset(slot):
+            self._ready.put_nowait(slot)
+            return
+        await self._discard(slot)
+        self._top_up()
+
+    async def _new_slot(self) -> _Slot:
+        context = await self.browser.new_context(**self.context_options)
+        self.created += 1
+        for hook in self._setup_hooks:
+            await hook(context)
+        slot = _Slot(context, await context.new_page())
+        self._watch(slot)
+        return slot
+
+    async def _put_new(self):
+        try:
+            slot = await self._new_slot()
+        except Exception as e:
+            self._ready.put_nowait(e)
+            return
+        if self._closed:
+            await self._discard(slot)
+        else:
+            self._ready.put_nowait(slot)
+
+    def _refill(self):
+        task = asyncio.ensure_future(self._put_new())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _top_up(self):
+        if not self._closed and self._ready.qsize() + len(self._pending) < self.size:
+            self._refill()
+
+    def _watch(self, slot: _Slot):
+        def on_crash(_):
+            slot.crashed = True
+        slot.page.on("crash", on_crash)
+
+    async def _reset(self, slot: _Slot) -> bool:
+        context = slot.context
+        try:
+            for page in context.pages:
+                await page.close()
+            await context.unroute_all(behavior="ignoreErrors")
+            await context.clear_cookies()
+            await context.clear_permissions()
+            state = await context.storage_state()
+            if state["cookies"] or state["origins"]:
+                return False
+            for hook in self._setup_hooks:
+                await hook(context)
+            slot.page = await context.new_page()
+        except Error:
+            return False
+        self._watch(slot)
+        return True
+
+    async def _discard(self, slot: _Slot):
+        try:
+            await slot.context.close()
+        except Error:
+            pass
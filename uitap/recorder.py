@@ -0,0 +1,194 @@
+"""pytest plugin: flight recorder written out only for failing tests.
+
+While a test runs, its page keeps a bounded in-memory ring of the last
+``--flight-recorder N`` events (actions from ``uitap.instrument``, console
+messages, page errors, requests, responses and failed requests). With
+``--flight-screenshots N`` it also keeps the last N screenshots, a low-quality
+JPEG of the viewport downscaled to ``SCREENSHOT_SCALE`` after each action
+(Chromium's DevTools capture; at most one in flight per page, further steps
+are skipped meanwhile). They cost every test, passing or not, so they are off
+by default. Nothing touches the disk on a passing test.
+
+When a test fails, the ring is written to ``--flight-dir`` (``events.jsonl``
+plus ``step-NN.jpg``) and attached to the failing report for pytest-html.
+``--flight-recorder 0`` turns the recorder off.
+"""
+import asyncio
+import base64
+import json
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from playwright.async_api import Error, Page
+
+from uitap import instrument
+
+try:
+    from pytest_html import extras
+except ImportError:
+    extras = None
+
+FLIGHT_DIR = Path(".uitap") / "flight"
+SCREENSHOT_SCALE = 0.4
+SCREENSHOT_QUALITY = 35
+#### browsers without a DevTools session: full-size viewport capture
+SCREENSHOT = {"type": "jpeg", "quality": SCREENSHOT_QUALITY, "scale": "css", "timeout": 2000}
+
+_rings = {}
+_pages = {}
+_failed = {}
+
+
+class Ring:
+    def __init__(self, events, screenshots):
+        self.events = deque(maxlen=events)
+        self.screenshots = deque(maxlen=screenshots)
+        self._shooting = None
+        self._cdp = None
+
+    def add(self, kind, **fields):
+        self.events.append({"ts": time.time(), "kind": kind, **fields})
+
+    def shoot(self, page: Page, step):
+        if not self.screenshots.maxlen or self._shooting is not None or page.is_closed():
+            return
+        self._shooting = asyncio.ensure_future(self._screenshot(page, step))
+
+    async def _capture(self, page: Page):
+        if self._cdp is None:
+            try:
+                self._cdp = await page.context.new_cdp_session(page)
+            except Error:
+                self._cdp = False
+        if self._cdp is False:
+            return await page.screenshot(**SCREENSHOT)
+        viewport = (await self._cdp.send("Page.getLayoutMetrics"))["cssVisualViewport"]
+        clip = {"x": viewport["pageX"], "y": viewport["pageY"], "width": viewport["clientWidth"],
+                "height": viewport["clientHeight"], "scale": SCREENSHOT_SCALE}
+        shot = await self._cdp.send("Page.captureScreenshot",
+                                    {"format": "jpeg", "quality": SCREENSHOT_QUALITY, "clip": clip})
+        return base64.b64decode(shot["data"])
+
+    async def _screenshot(self, page, step):
+        instrument.internal.set(True)
+        try:
+            self.screenshots.append((step, await self._capture(page)))
+        except Exception:
+            pass
+        finally:
+            self._shooting = None
+
+    async def settle(self):
+        if self._shooting is not None:
+            await asyncio.gather(self._shooting, return_exceptions=True)
+        if self._cdp:
+            try:
+                await self._cdp.detach()
+            except Error:
+                pass
+            self._cdp = None
+
+    def watch(self, page: Page):
+        page.on("console", lambda m: self.add("console", type=m.type, text=m.text))
+        page.on("pageerror", lambda e: self.add("pageerror", text=str(e)))
+        page.on("request", lambda r: self.add("request", method=r.method, url=r.url))
+        page.on("response", lambda r: self.add("response", status=r.status, url=r.url))
+        page.on("requestfailed", lambda r: self.add("requestfailed", url=r.url, error=r.failure))
+
+
+def _owner(nodeid):
+    #### tests on a module's shared page record into the ring of the module
+    if nodeid in _rings:
+        return nodeid
+    return nodeid.split("::")[0] if nodeid else None
+
+
+def _record(record):
+    owner = _owner(record["test"])
+    ring = _rings.get(owner)
+    if ring is None:
+        return
+    ring.add("action", **{k: record[k] for k in ("test", "action", "selector", "ms", "ok")})
+    ring.shoot(_pages[owner], f"{record['action']} {record['selector']}".strip())
+
+
+@asynccontextmanager
+async def prepared(page: Page, item):
+    config = item.config
+    size = config.getoption("flight_recorder")
+    if not size:
+        yield page
+        return
+    ring = Ring(size, config.getoption("flight_screenshots"))
+    ring.watch(page)
+    _rings[item.nodeid] = ring
+    _pages[item.nodeid] = page
+    try:
+        yield page
+    finally:
+        await ring.settle()
+        if item.nodeid in _failed:
+            _write(item, ring)
+        _rings.pop(item.nodeid, None)
+        _pages.pop(item.nodeid, None)
+
+
+def dump(ring, directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / "events.jsonl", "w", encoding="utf-8") as f:
+        for event in ring.events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    shots = []
+    for i, (step, image) in enumerate(ring.screenshots, 1):
+        (directory / f"step-{i:02d}.jpg").write_bytes(image)
+        shots.append((step, image))
+    return shots
+
+
+def _write(item, ring):
+    failed = _failed.pop(item.nodeid)
+    directory = Path(item.config.getoption("flight_dir")) / re.sub(r"[^\w.\[\]-]+", "_", item.nodeid)
+    shots = dump(ring, directory)
+    if extras is not None:
+        failed.extras = getattr(failed, "extras", []) + [extras.json(list(ring.events), name="flight recorder")] + [
+            extras.jpg(base64.b64encode(image).decode("ascii"), name=step) for step, image in shots]
+    failed.sections.append(("flight recorder", f"{len(ring.events)} events, {len(shots)} screenshots in {directory}"))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--flight-recorder", type=int, default=200, metavar="N",
+                    help="keep the last N actions/console/network events per test, written out when it fails (0: off)")
+    group.addoption("--flight-screenshots", type=int, default=0, metavar="N",
+                    help="also keep the last N per-step screenshots in the flight recorder (default: 0, none)")
+    group.addoption("--flight-dir", default=str(FLIGHT_DIR), metavar="DIR",
+                    help=f"where the flight recorder of failing tests is written (default: {FLIGHT_DIR})")
+
+
+def pytest_configure(config):
+    if config.getoption("flight_recorder"):
+        instrument.add_listener(_record)
+
+
+def pytest_unconfigure(config):
+    if config.getoption("flight_recorder"):
+        instrument.remove_listener(_record)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = (yield).get_result()
+    if not report.failed or item.nodeid in _failed:
+        return
+    owner = _owner(item.nodeid)
+    if owner not in _rings:
+        #### no page ring (static or fixture-less test, or after the page is gone): nothing to write
+        return
+    _failed[item.nodeid] = report
+    if owner != item.nodeid:
+        #### shared page: the ring outlives the test, write it out now
+        _write(item, _rings[owner])
@@ -0,0 +1,147 @@
+"""Record/replay of everything the suite loads, through context-level routing.
+
+In ``record`` mode every request a context makes goes to the network once and
+its response is written into an on-disk archive::
+
+    archive/index.json          request key -> recorded responses
+    archive/bodies/<sha256>     response bodies, stored once per content
+
+In ``replay`` mode the same routes answer from the archive and anything that
+was not recorded is aborted, so a run never touches the network. Requests to
+the base URL are keyed by path and query only, which lets an archive recorded
+against uitestingplayground.com be replayed under any ``--base-url``.
+
+A key may hold several responses (``/dynamicid`` serves a new id per load);
+replay hands them out in recorded order, per context. ``save`` merges the
+variants this process recorded into the index on disk under a lock, so shard
+workers recording at the same time do not drop each other's entries.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Error, Route
+
+from uitap.filelock import locked
+
+MODES = ("off", "record", "replay")
+MAX_VARIANTS = 5
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+#### change from one load to the next without the response changing; kept out of the archive
+_VOLATILE_HEADERS = {"date", "expires", "age", "set-cookie", "etag", "last-modified", "cf-ray", "x-request-id",
+                     "report-to", "nel", "server-timing"}
+
+
+class ArchiveMiss(LookupError):
+    pass
+
+
+class Archive:
+    def __init__(self, root, base_url, mode="replay"):
+        if mode not in MODES[1:]:
+            raise ValueError(f"unknown replay mode {mode!r}")
+        self.root = Path(root)
+        self.mode = mode
+        self.misses = []
+        base = urlsplit(base_url)
+        self._origin = (base.scheme, base.netloc)
+        self._entries = {}
+        self._added = []
+        index = self.root / "index.json"
+        if index.exists():
+            self._entries = self._read_index()
+        elif mode == "replay":
+            raise FileNotFoundError(f"no replay archive at {self.root}, record one with --replay-mode=record")
+
+    def _read_index(self):
+        try:
+            return json.loads((self.root / "index.json").read_text(encoding="utf-8"))["entries"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    @staticmethod
+    def _add_variant(variants, entry):
+        #### a variant is a distinct status + body; headers alone do not make a new one
+        if any(v["status"] == entry["status"] and v["body"] == entry["body"] for v in variants):
+            return False
+        variants.append(entry)
+        del variants[:-MAX_VARIANTS]
+        return True
+
+    def key(self, method, url, post_data=None):
+        parts = urlsplit(url)
+        if (parts.scheme, parts.netloc) == self._origin:
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+        else:
+            target = parts._replace(fragment="").geturl()
+        key = f"{method} {target}"
+        if post_data:
+            key += " #" + hashlib.sha256(post_data).hexdigest()[:16]
+        return key
+
+    def lookup(self, key, nth=0):
+        variants = self._entries.get(key)
+        if not variants:
+            raise ArchiveMiss(key)
+        entry = variants[nth % len(variants)]
+        body = (self.root / "bodies" / entry["body"]).read_bytes()
+        return entry["status"], entry["headers"], body
+
+    def store(self, key, status, headers, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.root / "bodies" / digest
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(body)
+        headers = {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS | _VOLATILE_HEADERS}
+        entry = {"status": status, "headers": headers, "body": digest}
+        if self._add_variant(self._entries.setdefault(key, []), entry):
+            self._added.append((key, entry))
+
+    def save(self):
+        if not self._added:
+            return
+        index = self.root / "index.json"
+        with locked(index):
+            #### other processes may have saved since this one loaded the index: merge, do not overwrite
+            entries = self._read_index()
+            for key, entry in self._added:
+                self._add_variant(entries.setdefault(key, []), entry)
+            tmp = self.root / f"index.json.{os.getpid()}"
+            tmp.write_text(json.dumps({"version": 1, "entries": entries}, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, index)
+        self._entries = entries
+        self._added = []
+
+    async def attach(self, context: BrowserContext):
+        """Route all requests of ``context`` through the archive."""
+        served = {}
+
+        async def handle(route: Route):
+            request = route.request
+            key = self.key(request.method, request.url, request.post_data_buffer)
+            if self.mode == "record":
+                try:
+                    response = await route.fetch()
+                    body = await response.body()
+                except Error:
+                    await route.abort()
+                    return
+                self.store(key, response.status, response.headers, body)
+                await route.fulfill(response=response, body=body)
+                return
+            nth = served.get(key, 0)
+            served[key] = nth + 1
+            try:
+                status, headers, body = self.lookup(key, nth)
+            except ArchiveMiss:
+                self.misses.append(key)
+                await route.abort("internetdisconnected")
+                return
+            await route.fulfill(status=status, headers=headers, body=body)
+
+        await context.route("**/*", handle)
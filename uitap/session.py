@@ -0,0 +1,79 @@
+"""Building blocks of the browser session, shared by the pytest fixtures and the runners."""
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import Browser, BrowserContext, Page
+
+from uitap import clock, daemon, incremental, navigation, perf, recorder
+from uitap.pool import ContextPool
+from uitap.replay import Archive
+
+DEFAULT_BASE_URL = "http://uitestingplayground.com"
+DEFAULT_TIMEOUT = 6000
+
+
+def launch_args(config):
+    return {"headless": not config.getoption("headed", False)}
+
+
+async def open_browser(playwright, config):
+    """Attach to the warm browser daemon when it is up, launch in-process otherwise."""
+    started = time.perf_counter()
+    args = launch_args(config)
+    browser = None if config.getoption("no_daemon") else await daemon.connect(playwright, args)
+    config._uitap_browser_in_process = browser is None
+    if browser is None:
+        browser = await playwright.chromium.launch(**args)
+    config._uitap_browser_launch_s = time.perf_counter() - started
+    return browser
+
+
+def base_url(config):
+    #### Single switch for the target site: --base-url (pytest-base-url) or the base_url ini value.
+    return config.getoption("base_url", None) or DEFAULT_BASE_URL
+
+
+def context_options(config):
+    return {"base_url": base_url(config)}
+
+
+def open_archive(config):
+    """The session's record/replay archive, or None when --replay-mode=off."""
+    mode = config.getoption("replay_mode")
+    if mode == "off":
+        return None
+    archive = getattr(config, "_uitap_replay_archive", None)
+    if archive is None:
+        archive = Archive(config.getoption("replay_archive"), base_url(config), mode)
+        config._uitap_replay_archive = archive
+    return archive
+
+
+async def prepare_context(context: BrowserContext, config, archive):
+    if archive is not None:
+        await archive.attach(context)
+    if config.getoption("fake_time"):
+        await clock.install(context)
+
+
+async def start_pool(browser: Browser, config, archive, size=None) -> ContextPool:
+    pool = ContextPool(browser,
+                       size=size or config.getoption("context_pool_size"),
+                       max_uses=config.getoption("context_max_uses"),
+                       context_options=context_options(config))
+    if archive is not None:
+        pool.add_setup(archive.attach)
+    if config.getoption("fake_time"):
+        pool.add_setup(clock.install)
+    await pool.start()
+    return pool
+
+
+@asynccontextmanager
+async def prepared(page: Page, item):
+    """Per-test page setup: default timeout, resource blocking, navigation stats, flight recorder, visited routes
+    and performance budgets."""
+    page.set_default_timeout(DEFAULT_TIMEOUT)
+    async with (navigation.prepared(page, item), recorder.prepared(page, item), incremental.prepared(page, item),
+                perf.prepared(page, item)):
+        yield page
@@ -0,0 +1,387 @@
+"""pytest plugin: split the suite across processes and CI nodes by historical test duration.
+
+Every run records setup+call+teardown time of each test in
+``.uitap/durations.json`` (an exponential moving average). Tests without
+history cost the median of the known ones.
+
+``--processes N``
+    this pytest process becomes a coordinator: it starts N worker pytest
+    processes (each with its own browser), hands tests out longest first from
+    per-worker queues balanced by expected cost (LPT), and lets a worker that
+    runs dry steal the cheapest remaining test from the busiest queue. Worker
+    reports are replayed into the coordinator's hooks, so the terminal summary,
+    exit status and ``--html`` report cover the whole suite.
+
+``--shard K/N``
+    run only the K-th of N cost-balanced shards (for separate CI nodes).
+    ``--shard-results PATH`` writes the reports of a run as JSON lines and
+    ``--merge-shards 'shard-*.jsonl' --html=report.html`` turns the results of
+    all nodes into one report without running tests.
+"""
+import argparse
+import glob
+import json
+import os
+import secrets
+import selectors
+import socket
+import statistics
+import subprocess
+import sys
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+HISTORY = Path(".uitap") / "durations.json"
+SMOOTHING = 0.3
+DEFAULT_COST = 1.0
+
+#### options of the coordinator that must not be passed on to its workers (name -> takes a value)
+_COORDINATOR_ONLY = {"--processes": True, "--shard": True, "--shard-results": True, "--merge-shards": True,
+                     "--html": True, "--self-contained-html": False, "--junitxml": True, "--junit-xml": True,
+                     "--bench-output": True, "--action-log": True, "--concurrency": True}
+
+_config = None
+_pending = {}
+_observed = {}
+_not_passed = set()
+_results_file = None
+_worker = None
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--processes", type=int, default=1, metavar="N",
+                    help="run the suite in N worker processes balanced by historical durations")
+    group.addoption("--shard", default=None, metavar="K/N",
+                    help="run only the K-th of N cost-balanced shards")
+    group.addoption("--shard-results", default=None, metavar="PATH",
+                    help="write the test reports of this run to PATH (JSON lines) for --merge-shards")
+    group.addoption("--merge-shards", action="append", default=[], metavar="GLOB",
+                    help="do not run tests, report the results stored by --shard-results instead")
+    group.addoption("--durations-history", default=str(HISTORY), metavar="PATH",
+                    help=f"per-test duration history used for sharding (default: {HISTORY})")
+    group.addoption("--shard-worker", default=None, help=argparse.SUPPRESS)
+
+
+#### cost model
+
+
+def load_history(path):
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_history(path, history, observed):
+    for nodeid, seconds in observed.items():
+        previous = history.get(nodeid)
+        history[nodeid] = seconds if previous is None else previous + SMOOTHING * (seconds - previous)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=1, sort_keys=True), encoding="utf-8")
+
+
+def estimate(nodeids, history):
+    known = [history[n] for n in nodeids if n in history]
+    default = statistics.median(known) if known else DEFAULT_COST
+    return {nodeid: history.get(nodeid, default) for nodeid in nodeids}
+
+
+def partition(costs, shards):
+    """Longest-processing-time-first assignment of tests to ``shards`` bins."""
+    bins = [[] for _ in range(shards)]
+    loads = [0.0] * shards
+    for nodeid in sorted(costs, key=lambda n: (-costs[n], n)):
+        target = loads.index(min(loads))
+        bins[target].append(nodeid)
+        loads[target] += costs[nodeid]
+    return bins
+
+
+class Scheduler:
+    """Per-worker queues from ``partition``; an idle worker steals from the busiest queue."""
+
+    def __init__(self, costs, workers):
+        self.costs = costs
+        self.queues = [deque(b) for b in partition(costs, workers)]
+
+    def remaining(self, worker):
+        return sum(self.costs[n] for n in self.queues[worker])
+
+    def next(self, worker):
+        queue = self.queues[worker]
+        if queue:
+            return queue.popleft()
+        victim = max(range(len(self.queues)), key=self.remaining)
+        if self.queues[victim]:
+            return self.queues[victim].pop()
+        return None
+
+
+#### every process: duration history and --shard-results
+
+
+def pytest_configure(config):
+    global _config, _results_file, _worker
+    _config = config
+    path = config.getoption("shard_results")
+    if path:
+        _results_file = open(path, "w", encoding="utf-8")
+    if config.getoption("shard_worker"):
+        _worker = _WorkerLink(config)
+
+
+def pytest_unconfigure(config):
+    if _results_file is not None:
+        _results_file.close()
+
+
+def pytest_collection_modifyitems(config, items):
+    spec = config.getoption("shard")
+    if not spec:
+        return
+    try:
+        index, total = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise pytest.UsageError(f"--shard {spec}: expected K/N, e.g. --shard 2/4") from None
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard {spec}: K must be between 1 and N")
+    costs = estimate([item.nodeid for item in items], load_history(config.getoption("durations_history")))
+    selected = set(partition(costs, total)[index - 1])
+    config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in selected])
+    items[:] = [item for item in items if item.nodeid in selected]
+
+
+def pytest_runtest_logstart(nodeid, location):
+    if _worker is not None:
+        _worker.send({"event": "logstart", "nodeid": nodeid, "location": location})
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_logreport(report):
+    _observed[report.nodeid] = _observed.get(report.nodeid, 0.0) + report.duration
+    if not report.passed:
+        _not_passed.add(report.nodeid)
+    if _results_file is None and _worker is None:
+        return
+    #### the flight recorder (failing call report) and perf (teardown section) add to the reports during
+    #### teardown, so a test's reports are serialized together once its teardown report is in
+    reports = _pending.setdefault(report.nodeid, [])
+    reports.append(report)
+    if report.when != "teardown":
+        return
+    for report in _pending.pop(report.nodeid):
+        data = _config.hook.pytest_report_to_serializable(config=_config, report=report)
+        if _results_file is not None:
+            _results_file.write(json.dumps(data) + "\n")
+        if _worker is not None:
+            _worker.send({"event": "logreport", "report": data})
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    if _worker is not None:
+        _worker.send({"event": "logfinish", "nodeid": nodeid, "location": location})
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    path = config.getoption("durations_history")
+    if not path or _worker is not None or config.option.collectonly:
+        return
+    passed = {n: s for n, s in _observed.items() if n not in _not_passed}
+    if passed:
+        save_history(path, load_history(path), passed)
+
+
+#### test loop: coordinator, worker or merge
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    config = session.config
+    if config.option.collectonly:
+        return None
+    if _worker is not None:
+        _worker.serve(session)
+        return True
+    if config.getoption("merge_shards"):
+        _merge(config, config.getoption("merge_shards"))
+        return True
+    if config.getoption("processes") > 1 and session.items:
+        if session.testsfailed and not config.option.continue_on_collection_errors:
+            raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+        _Coordinator(session).run()
+        if session.shouldfail:
+            raise session.Failed(session.shouldfail)
+        if session.shouldstop:
+            raise session.Interrupted(session.shouldstop)
+        return True
+    return None
+
+
+def _replay(config, message):
+    event = message["event"]
+    if event == "logreport":
+        report = config.hook.pytest_report_from_serializable(config=config, data=message["report"])
+        config.hook.pytest_runtest_logreport(report=report)
+    elif event in ("logstart", "logfinish"):
+        hook = getattr(config.hook, f"pytest_runtest_{event}")
+        hook(nodeid=message["nodeid"], location=tuple(message["location"]))
+
+
+def _merge(config, patterns):
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        raise pytest.UsageError(f"--merge-shards: no files match {patterns}")
+    for path in paths:
+        with open(path, encoding="utf-8") as results:
+            for line in results:
+                report = config.hook.pytest_report_from_serializable(config=config, data=json.loads(line))
+                if report.when == "setup":
+                    config.hook.pytest_runtest_logstart(nodeid=report.nodeid, location=report.location)
+                config.hook.pytest_runtest_logreport(report=report)
+                if report.when == "teardown":
+                    config.hook.pytest_runtest_logfinish(nodeid=report.nodeid, location=report.location)
+
+
+def worker_args(args):
+    """Invocation arguments minus the options only the coordinator may act on."""
+    kept, skip = [], False
+    for arg in args:
+        if skip:
+            skip = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in _COORDINATOR_ONLY:
+            skip = _COORDINATOR_ONLY[name] and "=" not in arg
+            continue
+        kept.append(arg)
+    return kept
+
+
+class _Connection:
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+        self.worker = None
+        self.assigned = deque()
+
+    def send(self, message):
+        self.sock.sendall(json.dumps(message).encode() + b"\n")
+
+    def receive(self):
+        data = self.sock.recv(1 << 16)
+        if not data:
+            return None
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        return [json.loads(line) for line in lines]
+
+
+class _Coordinator:
+    def __init__(self, session):
+        self.session = session
+        self.config = session.config
+        self.items = {item.nodeid: item for item in session.items}
+        history = load_history(self.config.getoption("durations_history"))
+        self.workers = min(self.config.getoption("processes"), len(self.items))
+        self.scheduler = Scheduler(estimate(list(self.items), history), self.workers)
+        self.key = secrets.token_hex(16)
+
+    def run(self):
+        server = socket.create_server(("127.0.0.1", 0))
+        server.setblocking(False)
+        host, port = server.getsockname()
+        args = worker_args(self.config.invocation_params.args)
+        command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", *args]
+        env = dict(os.environ, UITAP_SHARD_KEY=self.key)
+        processes = [subprocess.Popen(command + [f"--shard-worker={host}:{port}:{i}"], env=env,
+                                      cwd=self.config.invocation_params.dir,
+                                      stdout=subprocess.DEVNULL)
+                     for i in range(self.workers)]
+        selector = selectors.DefaultSelector()
+        selector.register(server, selectors.EVENT_READ)
+        open_connections = 0
+        try:
+            while processes or open_connections:
+                for key, _ in selector.select(timeout=1):
+                    if key.fileobj is server:
+                        sock, _ = server.accept()
+                        sock.setblocking(True)
+                        selector.register(sock, selectors.EVENT_READ, _Connection(sock))
+                        open_connections += 1
+                        continue
+                    connection = key.data
+                    messages = connection.receive()
+                    if messages is None:
+                        selector.unregister(connection.sock)
+                        connection.sock.close()
+                        open_connections -= 1
+                        self._fail(connection.assigned, f"shard worker {connection.worker} exited while holding this test")
+                        continue
+                    for message in messages:
+                        self._handle(connection, message)
+                processes = [p for p in processes if p.poll() is None]
+            if not (self.session.shouldfail or self.session.shouldstop):
+                self._fail([n for queue in self.scheduler.queues for n in queue], "not run: every shard worker exited")
+        finally:
+            for process in processes:
+                process.kill()
+            server.close()
+
+    def _handle(self, connection, message):
+        event = message["event"]
+        if event == "hello":
+            if message.get("key") == self.key:
+                connection.worker = message["worker"]
+        elif connection.worker is None:
+            return
+        elif event == "next":
+            #### -x / --maxfail: hand out nothing more once the replayed reports tripped it
+            stopping = self.session.shouldfail or self.session.shouldstop
+            nodeid = None if stopping else self.scheduler.next(connection.worker)
+            if nodeid is not None:
+                connection.assigned.append(nodeid)
+            connection.send({"event": "run" if nodeid else "stop", "nodeid": nodeid})
+        elif event == "done":
+            connection.assigned.remove(message["nodeid"])
+        else:
+            _replay(self.config, message)
+
+    def _fail(self, nodeids, reason):
+        #### tests a dead worker held (or nobody could take) are reported as failed instead of vanishing
+        for nodeid in list(nodeids):
+            location = self.items[nodeid].location
+            report = pytest.TestReport(nodeid, location, {}, "failed", reason, "call")
+            self.config.hook.pytest_runtest_logstart(nodeid=nodeid, location=location)
+            self.config.hook.pytest_runtest_logreport(report=report)
+            self.config.hook.pytest_runtest_logfinish(nodeid=nodeid, location=location)
+
+
+class _WorkerLink:
+    def __init__(self, config):
+        host, port, worker = config.getoption("shard_worker").rsplit(":", 2)
+        self.sock = socket.create_connection((host, int(port)))
+        self.file = self.sock.makefile("rb")
+        self.send({"event": "hello", "worker": int(worker), "key": os.environ.get("UITAP_SHARD_KEY")})
+
+    def send(self, message):
+        self.sock.sendall(json.dumps(message).encode() + b"\n")
+
+    def request(self):
+        self.send({"event": "next"})
+        return json.loads(self.file.readline())["nodeid"]
+
+    def serve(self, session):
+        items = {item.nodeid: item for item in session.items}
+        current = self.request()
+        while current is not None:
+            upcoming = self.request()
+            item = items[current]
+            item.config.hook.pytest_runtest_protocol(item=item, nextitem=items.get(upcoming))
+            self.send({"event": "done", "nodeid": current})
+            current = upcoming
+        self.sock.close()
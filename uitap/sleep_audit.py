@@ -0,0 +1,117 @@
+"""pytest plugin: record unconditional sleeps made by test code (``--sleep-audit``).
+
+``Page.wait_for_timeout``, ``Frame.wait_for_timeout``, ``asyncio.sleep`` and
+``time.sleep`` are wrapped for the session. Calls coming from a ``test_*.py``
+file are charged to the running test with their call site; the terminal
+summary lists every test that slept. With ``--sleep-budget MS`` a test whose
+sleeps add up to more than MS milliseconds fails.
+"""
+import asyncio
+import functools
+import os
+import sys
+import time
+
+import pytest
+from playwright.async_api import Frame, Page
+
+from uitap.instrument import current_test
+
+_sleeps = {}
+_patched = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--sleep-audit", action="store_true",
+                    help="record and report the time every test spends in unconditional sleeps")
+    group.addoption("--sleep-budget", type=float, default=None, metavar="MS",
+                    help="fail tests that sleep for more than MS milliseconds in total (implies --sleep-audit)")
+
+
+def _test_call_site():
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.basename(filename).startswith("test_"):
+            return f"{os.path.basename(filename)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def _charge(site, ms):
+    test = current_test.get()
+    if test is not None and site is not None:
+        _sleeps.setdefault(test, []).append((site, ms))
+
+
+def _patch(owner, name, wrapper):
+    original = getattr(owner, name)
+    _patched.append((owner, name, original))
+    setattr(owner, name, functools.wraps(original)(wrapper(original)))
+
+
+def _wait_for_timeout(original):
+    async def wait_for_timeout(self, timeout):
+        _charge(_test_call_site(), timeout)
+        return await original(self, timeout)
+    return wait_for_timeout
+
+
+def _asyncio_sleep(original):
+    async def sleep(delay, *args, **kwargs):
+        _charge(_test_call_site(), delay * 1000)
+        return await original(delay, *args, **kwargs)
+    return sleep
+
+
+def _time_sleep(original):
+    def sleep(secs):
+        _charge(_test_call_site(), secs * 1000)
+        return original(secs)
+    return sleep
+
+
+def pytest_configure(config):
+    if config.getoption("sleep_budget") is not None:
+        config.option.sleep_audit = True
+    if not config.getoption("sleep_audit"):
+        return
+    _patch(Page, "wait_for_timeout", _wait_for_timeout)
+    _patch(Frame, "wait_for_timeout", _wait_for_timeout)
+    _patch(asyncio, "sleep", _asyncio_sleep)
+    _patch(time, "sleep", _time_sleep)
+
+
+def pytest_unconfigure(config):
+    while _patched:
+        owner, name, original = _patched.pop()
+        setattr(owner, name, original)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    budget = item.config.getoption("sleep_budget")
+    report = outcome.get_result()
+    if budget is None or call.when != "call" or not report.passed:
+        return
+    total = sum(ms for _, ms in _sleeps.get(item.nodeid, ()))
+    if total > budget:
+        sites = ", ".join(f"{site} ({ms:.0f} ms)" for site, ms in _sleeps[item.nodeid])
+        report.outcome = "failed"
+        report.longrepr = f"test slept {total:.0f} ms, over the --sleep-budget of {budget:.0f} ms: {sites}"
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.getoption("sleep_audit"):
+        return
+    terminalreporter.write_sep("-", "unconditional sleeps")
+    if not _sleeps:
+        terminalreporter.write_line("no test slept")
+        return
+    totals = sorted(((sum(ms for _, ms in calls), nodeid) for nodeid, calls in _sleeps.items()), reverse=True)
+    for total, nodeid in totals:
+        sites = ", ".join(site for site, _ in _sleeps[nodeid])
+        terminalreporter.write_line(f"{total:8.0f} ms  {nodeid}  [{sites}]")
+    terminalreporter.write_line(f"{sum(total for total, _ in totals):8.0f} ms  total over {len(totals)} tests")
@@ -0,0 +1,105 @@
+"""Reach a page state once, snapshot it, and reset the page to it before every test.
+
+A snapshot holds the URL, the state of every form control (value, checked,
+selected options) and local/session storage. ``SharedPage.reach(setup)`` runs
+``async setup(page)`` the first time, takes a snapshot, and on later calls
+restores the snapshot in the page: storage is rewritten and controls that
+changed get their old state back with ``input``/``change`` events, in document
+order, so dependent controls (e.g. the element type select of /autowait) are
+rebuilt before their children are restored. When the page moved to another URL
+or the restored state still differs from the snapshot, ``setup`` runs again.
+"""
+from dataclasses import dataclass
+
+from playwright.async_api import Page
+
+_CONTROLS_JS = """() => {
+    const counts = {};
+    const key = el => {
+        if (el.id) return '#' + el.id;
+        if (el.name) return el.tagName.toLowerCase() + '[name=' + el.name + ']';
+        const tag = el.tagName.toLowerCase();
+        counts[tag] = (counts[tag] || 0) + 1;
+        return tag + ':' + counts[tag];
+    };
+    return [...document.querySelectorAll('input, select, textarea')].map(el => [key(el), {
+        value: el.type === 'file' ? '' : el.value,
+        checked: !!el.checked,
+        selected: el.tagName === 'SELECT' ? [...el.options].map(o => o.selected) : null,
+    }]);
+}"""
+
+_STORAGE_JS = """() => [Object.assign({}, localStorage), Object.assign({}, sessionStorage)]"""
+
+_RESTORE_JS = """([controls, local, session]) => {
+    localStorage.clear();
+    Object.entries(local).forEach(([k, v]) => localStorage.setItem(k, v));
+    sessionStorage.clear();
+    Object.entries(session).forEach(([k, v]) => sessionStorage.setItem(k, v));
+    const find = key => {
+        if (key.startsWith('#')) return document.getElementById(key.slice(1));
+        if (key.includes('[name=')) {
+            const [tag, name] = key.slice(0, -1).split('[name=');
+            return document.querySelector(tag + '[name="' + CSS.escape(name) + '"]');
+        }
+        const [tag, n] = key.split(':');
+        return document.querySelectorAll(tag)[n - 1] || null;
+    };
+    for (const [key, state] of controls) {
+        const el = find(key);
+        if (!el) continue;
+        let changed = false;
+        if (state.selected) {
+            [...el.options].forEach((o, i) => {
+                if (o.selected !== !!state.selected[i]) { o.selected = !!state.selected[i]; changed = true; }
+            });
+        } else if (el.type === 'checkbox' || el.type === 'radio') {
+            if (el.checked !== state.checked) { el.checked = state.checked; changed = true; }
+        } else if (el.type !== 'file' && el.value !== state.value) {
+            el.value = state.value;
+            changed = true;
+        }
+        if (changed) {
+            el.dispatchEvent(new Event('input', {bubbles: true}));
+            el.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+    }
+}"""
+
+
+@dataclass(frozen=True)
+class PageSnapshot:
+    url: str
+    controls: list
+    local_storage: dict
+    session_storage: dict
+
+
+async def take(page: Page) -> PageSnapshot:
+    controls = await page.evaluate(_CONTROLS_JS)
+    local, session = await page.evaluate(_STORAGE_JS)
+    return PageSnapshot(page.url, controls, local, session)
+
+
+async def restore(page: Page, snapshot: PageSnapshot) -> bool:
+    """Reset the page to ``snapshot`` in place; False when that is not possible."""
+    if page.url != snapshot.url:
+        return False
+    await page.evaluate(_RESTORE_JS, [snapshot.controls, snapshot.local_storage, snapshot.session_storage])
+    return await take(page) == snapshot
+
+
+class SharedPage:
+    """A page kept for several tests, reset to the snapshot taken after each ``setup``."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self._snapshots = {}
+
+    async def reach(self, setup) -> Page:
+        snapshot = self._snapshots.get(setup)
+        if snapshot is not None and await restore(self.page, snapshot):
+            return self.page
+        await setup(self.page)
+        self._snapshots[setup] = await take(self.page)
+        return self.page
@@ -0,0 +1,131 @@
+"""Browserless checks on the served HTML: pooled HTTP fetches and a small parsed tree.
+
+``StaticSite`` fetches routes over one ``requests.Session`` (keep-alive
+connection pool), many at a time, and caches the parsed documents; under
+``--replay-mode=replay`` the documents come from the replay archive instead of
+the network. ``Element.find_all("a", class_="navbar-brand")`` and friends cover
+what the static tests need: tag and exact attribute matches, text content and
+attributes.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 10
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def pooled_session(size=FETCH_WORKERS) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class Element:
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+
+    @property
+    def text(self) -> str:
+        return "".join(c if isinstance(c, str) else c.text for c in self.children)
+
+    def iter(self):
+        for child in self.children:
+            if isinstance(child, Element):
+                yield child
+                yield from child.iter()
+
+    def find_all(self, tag=None, **attrs):
+        #### class_ for class; values compare with the whole attribute, as in [attr="value"] selectors
+        attrs = {name.rstrip("_"): value for name, value in attrs.items()}
+        return [el for el in self.iter()
+                if (tag is None or el.tag == tag) and all(el.attrs.get(k) == v for k, v in attrs.items())]
+
+    def find(self, tag=None, **attrs):
+        found = self.find_all(tag, **attrs)
+        return found[0] if found else None
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self._open = self.root
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, {name: value or "" for name, value in attrs}, self._open)
+        self._open.children.append(element)
+        if tag not in _VOID:
+            self._open = element
+
+    def handle_startendtag(self, tag, attrs):
+        self._open.children.append(Element(tag, {name: value or "" for name, value in attrs}, self._open))
+
+    def handle_endtag(self, tag):
+        element = self._open
+        while element is not self.root and element.tag != tag:
+            element = element.parent
+        if element is not self.root:
+            self._open = element.parent
+
+    def handle_data(self, data):
+        self._open.children.append(data)
+
+
+def parse(html) -> Element:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def title(document: Element) -> str:
+    element = document.find("title")
+    return " ".join(element.text.split()) if element else ""
+
+
+class StaticSite:
+    def __init__(self, base_url, archive=None):
+        self.base_url = base_url
+        self.archive = archive
+        self.session = pooled_session()
+        self._documents = {}
+
+    def _fetch(self, href):
+        if self.archive is not None and self.archive.mode == "replay":
+            status, headers, body = self.archive.lookup(self.archive.key("GET", urljoin(self.base_url, href)))
+            return parse(body.decode("utf-8", "replace"))
+        response = self.session.get(urljoin(self.base_url, href), timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return parse(response.text)
+
+    def _prefetch_one(self, href):
+        try:
+            return self._fetch(href)
+        except Exception:
+            return None
+
+    def prefetch(self, hrefs):
+        """Fetch ``hrefs`` concurrently; failures are left for ``document`` to raise."""
+        missing = [href for href in dict.fromkeys(hrefs) if href not in self._documents]
+        with ThreadPoolExecutor(FETCH_WORKERS) as pool:
+            for href, document in zip(missing, pool.map(self._prefetch_one, missing)):
+                if document is not None:
+                    self._documents[href] = document
+
+    def document(self, href) -> Element:
+        if href not in self._documents:
+            self._documents[href] = self._fetch(href)
+        return self._documents[href]
+
+    def close(self):
+        self.session.close()
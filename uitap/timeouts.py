@@ -0,0 +1,211 @@
+"""pytest plugin: timeouts derived from the latencies observed in earlier runs.
+
+Every successful Playwright action (see ``uitap.instrument``) adds its duration
+to ``.uitap/latency.json`` under its action and selector, e.g.
+``LocatorAssertions.to_have_text span[id="clickCount"]``. The last ``SAMPLES``
+durations are kept per key, separately for each target site / replay mode /
+fake time combination, since those change latencies by orders of magnitude.
+
+Once a key has ``MIN_SAMPLES`` samples, its calls get
+``timeout = p99 * FACTOR + MARGIN_MS`` (between ``FLOOR_MS`` and
+``CEILING_MS``) instead of the value written in the test or the default
+timeout. Keys without history keep those values. So an action that normally
+takes 300 ms fails after about 1.6 s instead of 60 s, and one that is slow but
+healthy gets the time it needs instead of a hand-picked 500 ms.
+``--fixed-timeouts`` turns this off (the store is still updated). Tests
+marked ``@pytest.mark.fixed_timeouts`` (e.g. the upload scenarios, whose
+actions share keys with small uploads but take far longer) keep their own
+timeouts and add no samples. Calls inside ``with expected_timeout():`` (negative
+checks such as "this click must not go through") keep their written timeout,
+are not learned from and are not listed as expired.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import math
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from playwright.async_api import TimeoutError
+
+from uitap import instrument
+from uitap.bench import percentile
+from uitap.filelock import locked
+from uitap.session import base_url
+
+STORE = Path(".uitap") / "latency.json"
+SAMPLES = 50
+MIN_SAMPLES = 5
+FACTOR = 2.0
+MARGIN_MS = 1000
+FLOOR_MS = 1000
+CEILING_MS = 60000
+
+#### methods whose "timeout" is not a limit
+_NOT_A_LIMIT = {"wait_for_timeout"}
+
+_expecting_timeout = contextvars.ContextVar("uitap_expecting_timeout", default=False)
+
+
+@contextmanager
+def expected_timeout():
+    """Calls in the block are expected to fail on their written timeout: no learned limit, no samples."""
+    token = _expecting_timeout.set(True)
+    try:
+        yield
+    finally:
+        _expecting_timeout.reset(token)
+
+
+def key(action, selector):
+    return f"{action} {selector}".rstrip()
+
+
+def derive(samples):
+    if len(samples) < MIN_SAMPLES:
+        return None
+    return int(min(max(math.ceil(percentile(samples, 99) * FACTOR + MARGIN_MS), FLOOR_MS), CEILING_MS))
+
+
+class TimeoutProvider:
+    """Learned timeouts of one profile plus the samples of the current run."""
+
+    def __init__(self, path, profile, adaptive=True):
+        self.path = Path(path)
+        self.profile = profile
+        self.adaptive = adaptive
+        self.history = self._load().get(profile, {})
+        self.timeouts = {k: t for k, t in ((k, derive(s)) for k, s in self.history.items()) if t is not None}
+        self.observed = {}
+        self.applied = 0
+        self.expired = []
+        self.fixed = set()
+
+    def _load(self):
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def learned(self, action, selector):
+        """Timeout to use instead of the test's own, or None to keep it."""
+        if not self.adaptive or instrument.current_test.get() in self.fixed:
+            return None
+        timeout = self.timeouts.get(key(action, selector))
+        if timeout is not None:
+            self.applied += 1
+        return timeout
+
+    def __call__(self, record):
+        if record["ok"] and record["test"] not in self.fixed and not _expecting_timeout.get():
+            self.observed.setdefault(key(record["action"], record["selector"]), []).append(record["ms"])
+
+    def save(self):
+        if not self.observed:
+            return
+        with locked(self.path):
+            store = self._load()
+            profile = store.setdefault(self.profile, {})
+            for k, samples in self.observed.items():
+                profile[k] = (profile.get(k, []) + [round(ms, 1) for ms in samples])[-SAMPLES:]
+            temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            temporary.write_text(json.dumps(store, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(temporary, self.path)
+
+
+_provider = None
+_originals = []
+
+
+def _wrap(cls, name):
+    original = getattr(cls, name)
+    action = f"{cls.__name__}.{name}"
+
+    @functools.wraps(original)
+    async def wrapper(self, *args, **kwargs):
+        if _provider is None or _expecting_timeout.get():
+            return await original(self, *args, **kwargs)
+        selector = instrument.describe(self, args)
+        learned = _provider.learned(action, selector)
+        if learned is not None:
+            kwargs["timeout"] = learned
+        try:
+            return await original(self, *args, **kwargs)
+        except (TimeoutError, AssertionError):
+            if learned is not None:
+                _provider.expired.append((instrument.current_test.get(), key(action, selector), learned))
+            raise
+    _originals.append((cls, name, original))
+    setattr(cls, name, wrapper)
+
+
+def _install():
+    for cls, names in instrument.WRAPPED.items():
+        if names is None:
+            names = [n for n in dir(cls) if n.startswith(("to_", "not_to_"))]
+        for name in names:
+            method = getattr(cls, name, None)
+            if (name not in _NOT_A_LIMIT and inspect.iscoroutinefunction(method)
+                    and "timeout" in inspect.signature(method).parameters):
+                _wrap(cls, name)
+
+
+def _uninstall():
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+
+
+def profile(config):
+    time_mode = "fake-time" if config.getoption("fake_time") else "real-time"
+    return f"{base_url(config)} replay={config.getoption('replay_mode')} {time_mode}"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--fixed-timeouts", action="store_true",
+                    help="use the timeouts written in the tests instead of the ones learned from earlier runs")
+    group.addoption("--latency-store", default=str(STORE), metavar="PATH",
+                    help=f"per action/selector latency history for adaptive timeouts (default: {STORE})")
+
+
+def pytest_configure(config):
+    global _provider
+    config.addinivalue_line("markers", "fixed_timeouts: keep the timeouts written in the test, record no latencies")
+    if (config.option.collectonly or config.getoption("processes", 1) > 1 or config.getoption("merge_shards", None)
+            or config.getoption("load", 0)):
+        return
+    _provider = TimeoutProvider(config.getoption("latency_store"), profile(config),
+                                adaptive=not config.getoption("fixed_timeouts"))
+    instrument.add_listener(_provider)
+    _install()
+
+
+def pytest_collection_modifyitems(items):
+    if _provider is not None:
+        _provider.fixed.update(item.nodeid for item in items if item.get_closest_marker("fixed_timeouts"))
+
+
+def pytest_unconfigure(config):
+    global _provider
+    if _provider is None:
+        return
+    _uninstall()
+    instrument.remove_listener(_provider)
+    _provider = None
+
+
+def pytest_sessionfinish(session):
+    if _provider is not None:
+        _provider.save()
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _provider is None or not _provider.adaptive or not (_provider.applied or _provider.expired):
+        return
+    terminalreporter.write_sep("-", "adaptive timeouts")
+    terminalreporter.write_line(f"{len(_provider.timeouts)} learned timeouts, used {_provider.applied} times")
+    for test, k, timeout in _provider.expired:
+        terminalreporter.write_line(f"timed out after learned {timeout} ms: {k}  ({test})")
@@ -0,0 +1,128 @@
+"""pytest plugin and helpers: generated upload fixtures and upload timings (``--uploads``).
+
+Files are written in 1 MiB blocks from one reused buffer, so a 500 MiB file
+never exists in Python memory; Playwright hands local paths to a local
+browser and streams them to a connected one. ``--uploads`` launches the
+browser in-process (no warm daemon), so its processes are children of the run
+and ``PeakMemory`` can follow their RSS. Tests marked
+``@pytest.mark.uploads`` are skipped unless ``--uploads`` is given; their
+timings (seconds until the page reports the selection, MiB/s, RSS growth of
+Python and of the browser processes) are collected with ``record`` and listed
+at the end of the run.
+"""
+import asyncio
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from uitap import memory
+
+BLOCK = 1 << 20
+_UNITS = {"B": 1, "KiB": 1 << 10, "MiB": 1 << 20, "GiB": 1 << 30}
+
+_results = []
+
+
+def parse_size(text) -> int:
+    for unit in sorted(_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * _UNITS[unit])
+    return int(text)
+
+
+def generate(path, size) -> Path:
+    """Write ``size`` bytes to ``path`` in blocks of one reused buffer."""
+    block = bytes(range(256)) * (BLOCK // 256)
+    path = Path(path)
+    with open(path, "wb") as f:
+        left = size
+        while left > 0:
+            chunk = min(left, BLOCK)
+            f.write(block if chunk == BLOCK else block[:chunk])
+            left -= chunk
+    return path
+
+
+def generate_batch(directory, count, size):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    return [generate(directory / f"upload-{i:05d}.bin", size) for i in range(count)]
+
+
+@contextmanager
+def scratch_directory():
+    """Temporary directory on disk (not tmpfs when possible) removed afterwards, whatever the size of its files."""
+    base = os.environ.get("UITAP_UPLOAD_DIR") or ("/var/tmp" if os.path.isdir("/var/tmp") else None)
+    with tempfile.TemporaryDirectory(prefix="uitap-upload-", dir=base) as directory:
+        yield Path(directory)
+
+
+class PeakMemory:
+    """Highest RSS growth of Python and of the browser processes while the block runs, sampled every ``interval`` s."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.python_kib = self.browser_kib = 0
+        self._baseline = None
+        self._task = None
+
+    async def _take(self):
+        python_kb, browser_kb = await asyncio.to_thread(memory.sample)
+        self.python_kib = max(self.python_kib, python_kb - self._baseline[0])
+        self.browser_kib = max(self.browser_kib, browser_kb - self._baseline[1])
+
+    async def _run(self):
+        while True:
+            await self._take()
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self):
+        self._baseline = await asyncio.to_thread(memory.sample)
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        await self._take()
+
+
+def record(scenario, files, total_bytes, seconds, python_kib, browser_kib):
+    _results.append((scenario, files, total_bytes, seconds, python_kib, browser_kib))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("uitap")
+    group.addoption("--uploads", action="store_true",
+                    help="run the large-file and many-file upload scenarios (test_uploads.py)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "uploads: generated large/many-file upload scenario, runs only with --uploads")
+    if config.getoption("uploads"):
+        #### a daemon browser is not a child of this process, its memory would not be measured
+        config.option.no_daemon = True
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("uploads"):
+        return
+    skip = pytest.mark.skip(reason="upload scenario, run with --uploads")
+    for item in items:
+        if item.get_closest_marker("uploads"):
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.write_sep("-", "uploads")
+    terminalreporter.write_line(f"{'files':>6} {'MiB':>9} {'s':>7} {'MiB/s':>8} {'py +MiB':>8} {'browser +MiB':>12}  scenario")
+    for scenario, files, total, seconds, python_kib, browser_kib in _results:
+        mib = total / _UNITS["MiB"]
+        terminalreporter.write_line(
+            f"{files:6d} {mib:9.1f} {seconds:7.2f} {mib / seconds if seconds else 0:8.1f} "
+            f"{python_kib / 1024:8.1f} {browser_kib / 1024:12.1f}  {scenario}")
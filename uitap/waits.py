@@ -0,0 +1,95 @@
+"""Event-driven waits for the patterns the tests used to cover with fixed sleeps or polling loops."""
+import asyncio
+
+from playwright.async_api import FrameLocator, Locator, Page, expect
+
+_SETTLED_JS = """(el, frames) => new Promise(resolve => {
+    let last = el.value, stable = 0;
+    const tick = () => {
+        if (el.value === last) {
+            if (++stable >= frames) return resolve(el.value);
+        } else {
+            last = el.value;
+            stable = 0;
+        }
+        requestAnimationFrame(tick);
+    };
+    requestAnimationFrame(tick);
+})"""
+
+#### The predicate runs on every mutation of the element (or its subtree) inside the page;
+#### the optional target is clicked in the same callback, before the next frame is painted.
+_OBSERVE_JS = """(el, [target, arg]) => new Promise(resolve => {
+    const predicate = %s;
+    const check = () => {
+        const value = predicate(el, arg);
+        if (value === undefined || value === null || value === false) return false;
+        observer.disconnect();
+        if (target) target.click();
+        resolve(value);
+        return true;
+    };
+    const observer = new MutationObserver(check);
+    if (!check()) observer.observe(el, {attributes: true, characterData: true, childList: true, subtree: true});
+})"""
+
+_NUMBER_JS = """(el, [attribute, minimum]) => {
+    const raw = attribute ? el.getAttribute(attribute) : el.textContent;
+    const value = parseFloat((raw || "").replace(/[^0-9.+-]/g, ""));
+    return value >= minimum ? value : null;
+}"""
+
+
+def dialog_message(page: Page, accept=True) -> asyncio.Future:
+    """Future resolved with the message of the next dialog, which is accepted (or dismissed).
+
+    Create it before the action that opens the dialog::
+
+        message = dialog_message(page)
+        await button.click()
+        assert await asyncio.wait_for(message, 5) == "Primary button pressed"
+    """
+    message = asyncio.get_running_loop().create_future()
+
+    async def handle(dialog):
+        if not message.done():
+            message.set_result(dialog.message)
+        if accept:
+            await dialog.accept()
+        else:
+            await dialog.dismiss()
+    page.once("dialog", handle)
+    return message
+
+
+async def input_value_settled(field: Locator, frames=2, timeout=None) -> str:
+    """Value of ``field`` once it stayed unchanged for ``frames`` animation frames."""
+    return await field.evaluate(_SETTLED_JS, frames, timeout=timeout)
+
+
+async def file_selection_processed(frame: FrameLocator, count=1, timeout=None) -> str:
+    """Wait until the upload frame reports ``count`` selected files and return the status text."""
+    status = frame.locator('div[class=success-file]')
+    await expect(status).to_have_text(f"{count} file(s) selected", timeout=timeout)
+    return await status.inner_text()
+
+
+async def wait_for_predicate(element: Locator, predicate: str, arg=None, click: Locator = None, timeout=30000):
+    """Wait inside the page until the JS ``predicate(el, arg)`` returns a value other than null/false.
+
+    A MutationObserver re-checks the predicate on every change to ``element``, so
+    there is a single protocol round trip however long the wait is. When
+    ``click`` is given that element is clicked in the same callback. Returns the
+    predicate's value.
+    """
+    target = await click.element_handle() if click is not None else None
+    try:
+        return await asyncio.wait_for(element.evaluate(_OBSERVE_JS % predicate, [target, arg]), timeout / 1000)
+    finally:
+        if target is not None:
+            await target.dispose()
+
+
+async def wait_for_threshold(element: Locator, minimum, attribute=None, click: Locator = None, timeout=30000):
+    """Wait until the number in the text (or ``attribute``) of ``element`` reaches ``minimum`` and return it."""
+    return await wait_for_predicate(element, _NUMBER_JS, [attribute, minimum], click=click, timeout=timeout)